@@ -1,15 +1,38 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from backend.routes.auth import router as auth_router
 from backend.routes.resume import router as resume_router
 from backend.routes.conf_analysis import router as analysis_router
+from backend.routes import rag
 from backend.routes.rag import router as rag_router
 from backend.routes.tts import router as tts_router
 from backend.routes.conf_analysis import router as conf_router
+from backend.routes.health import router as health_router
+from backend.services import subsystems
+
+# 무거운 서브시스템(모델, 벡터 스토어, DB 스키마)을 기동 후 백그라운드에서 미리 로드
+WARMUP_ON_STARTUP = os.getenv("WARMUP_ON_STARTUP", "1") == "1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    tasks = []
+    if WARMUP_ON_STARTUP:
+        tasks.append(asyncio.create_task(subsystems.warm_up()))
+    # 수집 DB 가 설정돼 있으면 주기적으로 FAISS 인덱스에 변경분 반영
+    if rag.RAG_INGEST_DB:
+        tasks.append(asyncio.create_task(rag.index_sync_loop()))
+    yield
+    for task in tasks:
+        task.cancel()
+
 
 # FastAPI 앱 초기화
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 # CORS 설정
 app.add_middleware(
@@ -27,6 +50,7 @@ app.include_router(analysis_router, prefix="/analysis", tags=["Analysis"])
 app.include_router(rag_router, prefix="/rag", tags=["RAG"])
 app.include_router(tts_router, prefix="/tts", tags=["TTS"])
 app.include_router(conf_router, prefix="/conf", tags=['CONF'])
+app.include_router(health_router, prefix="/health", tags=["Health"])
 
 # 기본 라우트
 @app.get("/", tags=["Home"])
@@ -1,12 +1,16 @@
-from sqlalchemy import Column, String, Integer, LargeBinary
+from sqlalchemy import Column, DateTime, ForeignKey, String, Integer, LargeBinary, UniqueConstraint
+from sqlalchemy.dialects.mysql import LONGBLOB
+from sqlalchemy.orm import deferred
 from .database import Base
 
 class User(Base):
     __tablename__ = "users"
+    # 회원가입 중복 검사를 인덱스/제약 조건으로 (migrate_user_indexes 스크립트로 기존 DB 에 추가)
+    __table_args__ = (UniqueConstraint("name", name="uq_users_name"),)
 
     id = Column(String(50), primary_key=True, index=True, nullable=False)  # VARCHAR(50), 필수
     password = Column(String(100), nullable=False)  # VARCHAR(100), 필수
-    name = Column(String(100), nullable=False)  # VARCHAR(100), 필수
+    name = Column(String(100), nullable=False)  # VARCHAR(100), 필수, UNIQUE
     age = Column(Integer, nullable=True)  # 선택 입력
     contact = Column(String(15), nullable=True)  # VARCHAR(15), 선택 입력
     experience = Column(String(255), nullable=True)  # VARCHAR(255), 선택 입력
@@ -15,5 +19,43 @@ class User(Base):
     skills = Column(String(255), nullable=True)  # VARCHAR(255), 선택 입력
     desired_position = Column(String(100), nullable=True)  # VARCHAR(100), 선택 입력
     desired_location = Column(String(100), nullable=True)  # VARCHAR(100), 선택 입력
-    resume_pdf = Column(LargeBinary, nullable=True)  # 선택 입력
-    resume_word = Column(LargeBinary, nullable=True)  # 선택 입력
+    # 이력서 파일은 resume_files 테이블에 (로그인/프로필 조회가 파일 데이터를 읽지 않도록)
+
+
+class ResumeFile(Base):
+    __tablename__ = "resume_files"
+    __table_args__ = (UniqueConstraint("user_id", "kind", name="uq_resume_files_user_kind"),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(String(50), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    kind = Column(String(10), nullable=False)  # "pdf" | "word"
+    filename = Column(String(255), nullable=True)
+    content_type = Column(String(100), nullable=True)
+    size = Column(Integer, nullable=False)
+    sha256 = Column(String(64), nullable=False)
+    # 파일 데이터는 접근할 때만 로드 (목록/메타데이터 조회에는 포함되지 않음)
+    data = deferred(Column(LargeBinary().with_variant(LONGBLOB, "mysql"), nullable=False))
+
+
+class AuthSession(Base):
+    """로그인 시 발급한 세션 토큰 (토큰 원문 대신 sha256 만 저장)"""
+
+    __tablename__ = "auth_sessions"
+
+    token_hash = Column(String(64), primary_key=True)
+    user_id = Column(String(50), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
+
+
+class UserProfileEmbedding(Base):
+    """프로필 필드로 만든 추천용 임베딩 (임베딩 모델이 바뀌면 모델 이름별로 새로 계산)"""
+
+    __tablename__ = "user_profile_embeddings"
+
+    user_id = Column(String(50), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    model_name = Column(String(200), primary_key=True)
+    profile_hash = Column(String(64), nullable=False)  # 프로필 텍스트 sha256 (바뀌지 않았으면 다시 계산하지 않음)
+    dim = Column(Integer, nullable=False)
+    vector = Column(LargeBinary, nullable=False)  # float32 바이트
+    updated_at = Column(DateTime, nullable=False)
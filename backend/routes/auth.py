@@ -1,21 +1,23 @@
-from fastapi import APIRouter, HTTPException, Form, File, UploadFile
-from sqlalchemy.orm import Session
-from ..database import SessionLocal, init_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Form, File, UploadFile
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from ..database import get_db, schema
 from ..models import User
+from ..services.auth_sessions import AUTH_SESSION_TTL, bearer_token, current_user, issue_token, revoke_token
+from ..services.profile_embeddings import schedule_refresh
+from ..services.resume_files import save_resume_file
 from typing import Optional
 from pydantic import BaseModel
 
 
 router = APIRouter()
 
-# Initialize the database
-init_db()
-
 @router.post("/register")
 async def register_user(
     id: str = Form(...),
     password: str = Form(...),
-    name: Optional[str] = Form(None),
+    name: str = Form(...),
     age: Optional[int] = Form(None),
     contact: Optional[str] = Form(None),
     experience: Optional[str] = Form(None),
@@ -26,15 +28,20 @@ async def register_user(
     desired_location: Optional[str] = Form(None),
     resume_pdf: UploadFile = File(None),
     resume_word: UploadFile = File(None),
+    db: AsyncSession = Depends(get_db),
 ):
-    db: Session = SessionLocal()
+    # name 은 NOT NULL + UNIQUE 컬럼이라 빈 값은 넣기 전에 거절
+    name = name.strip()
+    if not name:
+        raise HTTPException(status_code=400, detail="NAME은 필수입니다.")
+
     try:
-        # 중복 검사
-        existing_user = db.query(User).filter((User.id == id) | (User.name == name)).first()
-        if existing_user:
-            raise HTTPException(status_code=400, detail="ID 또는 NAME이 이미 사용 중입니다.")
+        await schema.aget()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
 
-        # 사용자 생성
+    try:
+        # 사용자 생성 (중복 ID/NAME 은 기본 키 / uq_users_name 제약 조건 위반으로 확인)
         user = User(
             id=id,
             password=password,
@@ -47,17 +54,23 @@ async def register_user(
             skills=skills,
             desired_position=desired_position,
             desired_location=desired_location,
-            resume_pdf=await resume_pdf.read() if resume_pdf else None,
-            resume_word=await resume_word.read() if resume_word else None,
         )
         db.add(user)
-        db.commit()
+        await db.flush()
+        # 이력서 파일은 별도 테이블에
+        for kind, upload in (("pdf", resume_pdf), ("word", resume_word)):
+            if upload:
+                await save_resume_file(db, id, kind, await upload.read(), upload.filename, upload.content_type)
+        await db.commit()
+        # 추천용 프로필 임베딩은 백그라운드에서 계산
+        schedule_refresh(id)
         return {"message": "회원가입 성공"}
+    except IntegrityError:
+        await db.rollback()
+        raise HTTPException(status_code=400, detail="ID 또는 NAME이 이미 사용 중입니다.")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
-    finally:
-        db.close()        
         
         
 class LoginRequest(BaseModel):
@@ -67,12 +80,30 @@ class LoginRequest(BaseModel):
         
 
 @router.post("/login")
-async def login_user(id: str = Form(...), password: str = Form(...)):
-    db: Session = SessionLocal()
-    print(f"Login attempt: ID={id}, Password={password}")
-    user = db.query(User).filter(User.id == id, User.password == password).first()
+async def login_user(id: str = Form(...), password: str = Form(...), db: AsyncSession = Depends(get_db)):
+    try:
+        await schema.aget()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    print(f"Login attempt: ID={id}")
+    name = (await db.execute(select(User.name).where(User.id == id, User.password == password))).scalar()
 
-    if not user:
+    if name is None:
         raise HTTPException(status_code=400, detail="Invalid ID or password")
 
-    return {"message": f"Welcome {user.name}"}
+    # 이후 요청은 Authorization: Bearer <token> 으로 (토큰 확인은 캐시에서)
+    token = await issue_token(db, id, name)
+    return {"message": f"Welcome {name}", "token": token, "expires_in": int(AUTH_SESSION_TTL)}
+
+
+@router.get("/me")
+async def me(user: dict = Depends(current_user)):
+    """토큰의 사용자 정보"""
+    return user
+
+
+@router.post("/logout")
+async def logout_user(authorization: str = Header(None), db: AsyncSession = Depends(get_db)):
+    await revoke_token(db, bearer_token(authorization))
+    return {"message": "로그아웃 되었습니다."}
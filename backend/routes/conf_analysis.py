@@ -45,48 +45,92 @@
 
 
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect
-import tensorflow as tf
-import numpy as np
-import cv2
 import base64
-import os
+import asyncio
+from ..services import posture_model
+from ..services.posture_frames import LatestFrameSlot
 
 router = APIRouter()
 
-TFLITE_MODEL_PATH = "/Users/1tae/Desktop/bp/backend/models/model_unquant.tflite"
-
-# Load TensorFlow Lite model
-try:
-    interpreter = tf.lite.Interpreter(model_path=TFLITE_MODEL_PATH)
-    interpreter.allocate_tensors()
-    input_details = interpreter.get_input_details()
-    output_details = interpreter.get_output_details()
-    class_names = ["confident", "unconfident"]
-    print("TensorFlow Lite 모델 로드 성공")
-except Exception as e:
-    interpreter = None
-    print(f"TensorFlow Lite 모델 로드 실패: {e}")
-
 @router.websocket("/ws/analyze")
 async def analyze_posture(websocket: WebSocket):
+    session = await posture_model.open_session()
+    if session is None:
+        await websocket.close()
+        return
 
     try:
         await websocket.accept()
         while True:
             data = await websocket.receive_text()
             image_data = base64.b64decode(data)
-            img = cv2.imdecode(np.frombuffer(image_data, np.uint8), cv2.IMREAD_COLOR)
-
-            # Preprocess the image
-            img = cv2.resize(img, (224, 224))
-            input_data = np.expand_dims(img, axis=0).astype(np.float32) / 255.0
 
-            interpreter.set_tensor(input_details[0]['index'], input_data)
-            interpreter.invoke()
-            predictions = interpreter.get_tensor(output_details[0]['index'])[0]
-            label = class_names[np.argmax(predictions)]
+            # 변화가 없는 프레임은 이전 라벨 재사용, 나머지는 배치로 추론
+            label = await session.analyze(image_data)
+            if label is None:
+                continue
 
             # Send the label back to the client
             await websocket.send_json({"label": label})
     except WebSocketDisconnect:
         pass
+
+
+@router.websocket("/ws/analyze/v2")
+async def analyze_posture_v2(websocket: WebSocket):
+    """
+    v2 프로토콜: 바이너리 JPEG 프레임을 받고, 세션별 최신 프레임만 분석
+    응답: {"label", "processed", "dropped", "skip_ratio"}
+    """
+    session = await posture_model.open_session()
+    if session is None:
+        await websocket.close()
+        return
+
+    await websocket.accept()
+    slot = LatestFrameSlot()
+    processed = 0
+
+    async def receive_frames():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes"):
+                    slot.put(message["bytes"])
+        finally:
+            slot.close()
+
+    receiver = asyncio.create_task(receive_frames())
+    try:
+        while True:
+            data = await slot.get()
+            if data is None:
+                break
+
+            # 디코드/전처리는 이벤트 루프 밖에서, 미리 잡아 둔 버퍼에 기록
+            label = await session.analyze(data)
+            if label is None:
+                slot.dropped += 1
+                continue
+            processed += 1
+
+            await websocket.send_json(
+                {
+                    "label": label,
+                    "processed": processed,
+                    "dropped": slot.dropped,
+                    "skip_ratio": round(session.skip_ratio, 4),
+                }
+            )
+    except WebSocketDisconnect:
+        pass
+    finally:
+        receiver.cancel()
+
+
+@router.get("/stats")
+async def posture_stats():
+    """인터프리터 풀 크기, 대기열 길이, 워커별 사용률, 프레임 건너뛰기 비율"""
+    return posture_model.stats()
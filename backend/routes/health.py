@@ -0,0 +1,32 @@
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
+from ..database import pool_metrics
+from ..services import subsystems
+
+router = APIRouter()
+
+
+@router.get("/live")
+async def live():
+    """프로세스가 살아 있는지만 확인 (무거운 서브시스템과 무관)"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """
+    서브시스템별 로드 상태와 로드 시간
+    모두 ready 면 200, 하나라도 아니면 503 (준비된 라우트는 그 전에도 동작)
+    """
+    statuses = {name: s.status() for name, s in subsystems.registry.items()}
+    all_ready = all(s.ready for s in subsystems.registry.values())
+    return JSONResponse(
+        content={"status": "ready" if all_ready else "not_ready", "subsystems": statuses},
+        status_code=200 if all_ready else 503,
+    )
+
+
+@router.get("/db")
+async def db_pool():
+    """DB 커넥션 풀 사용 중/대기 연결 수와 요청별 커넥션 획득 대기 시간"""
+    return pool_metrics.stats()
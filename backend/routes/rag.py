@@ -1,101 +1,448 @@
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, Field
 from datetime import datetime
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
+import asyncio
+import logging
 import os
+import random
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Literal
+from ..database import get_db
+from ..services import profile_embeddings, subsystems
+from ..services.ann_index import read_index, set_search_params
+from ..services.auth_sessions import current_user
+from ..services.bounded_executor import BoundedExecutor, ExecutorSaturated
+from ..services.caches import LRUCache
+from ..services.doc_store import MmapDocStore, PickleDocStore
+from ..services.job_indexer import read_watermark, sync_index
+from ..services.job_search import JobIndex
+from ..services.mmr import diverse_rerank
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 # **파일 경로 설정**
 faiss_index_directory = "/Users/1tae/Desktop/bp/backend/faiss_index"
-faiss_index_path = os.path.join(faiss_index_directory, "index.faiss")
+# RAG_INDEX_FILE: build_ann_index 로 만든 근사 인덱스(index_hnsw.faiss 등)를 쓸 때 지정
+RAG_INDEX_FILE = os.getenv("RAG_INDEX_FILE", "index.faiss")
+RAG_INDEX_MMAP = os.getenv("RAG_INDEX_MMAP", "1") == "1"
+# 검색 파라미터 (지정하지 않으면 인덱스 옆 .json 값 사용)
+RAG_NPROBE = os.getenv("RAG_NPROBE")
+RAG_EF_SEARCH = os.getenv("RAG_EF_SEARCH")
+faiss_index_path = os.path.join(faiss_index_directory, RAG_INDEX_FILE)
 metadata_path = os.path.join(faiss_index_directory, "index.pkl")
+# 문서 저장소: auto (docstore/ 가 있으면 mmap) | mmap | pickle
+# docstore/ 는 python -m backend.scripts.convert_docstore 로 index.pkl 에서 변환
+RAG_DOCSTORE = os.getenv("RAG_DOCSTORE", "auto")
+docstore_directory = os.path.join(faiss_index_directory, "docstore")
+# 임베딩 모델 (사용자 프로필 임베딩은 모델 이름별로 저장)
+RAG_EMBEDDING_MODEL = os.getenv("RAG_EMBEDDING_MODEL", "dragonkue/bge-m3-ko")
+# 기본 인덱스에 반영된 마지막 수집 실행 번호 ({"ingest_run": N}, 인덱스를 새로 만들 때 함께 기록)
+watermark_path = os.path.join(faiss_index_directory, "ingest_watermark.json")
 
-# **파일 확인**
-if not os.path.exists(faiss_index_path):
-    raise RuntimeError(f"FAISS index file not found at {faiss_index_path}")
 
-if not os.path.exists(metadata_path):
-    raise RuntimeError(f"Metadata file not found at {metadata_path}")
+def _load_vector_store():
+    from langchain_huggingface import HuggingFaceEmbeddings
 
-# **RAG 모델 초기화**
-try:
+    # **파일 확인**
+    if not os.path.exists(faiss_index_path):
+        raise RuntimeError(f"FAISS index file not found at {faiss_index_path}")
+
+    use_mmap_docstore = RAG_DOCSTORE == "mmap" or (
+        RAG_DOCSTORE == "auto" and os.path.exists(os.path.join(docstore_directory, "manifest.json"))
+    )
+    if not use_mmap_docstore and not os.path.exists(metadata_path):
+        raise RuntimeError(f"Metadata file not found at {metadata_path}")
+
+    # **RAG 모델 초기화**
     print("Initializing RAG model...")
     embeddings = HuggingFaceEmbeddings(
-        model_name="dragonkue/bge-m3-ko",
+        model_name=RAG_EMBEDDING_MODEL,
         model_kwargs={"model_kwargs": {"torch_dtype": "float16"}},
     )
     print("Embeddings initialized successfully.")
-except Exception as e:
-    print(f"Error initializing embeddings: {str(e)}")
-    raise RuntimeError(f"Error initializing embeddings: {str(e)}")
-
-# **FAISS 인덱스 로드**
-try:
-    print(f"Loading FAISS index from {faiss_index_directory}...")
-    vector_store = FAISS.load_local(
-        faiss_index_directory, embeddings, allow_dangerous_deserialization=True
+
+    # **FAISS 인덱스 로드** (메모리 매핑: 같은 호스트의 워커들이 페이지를 공유)
+    print(f"Loading FAISS index from {faiss_index_path} (mmap={RAG_INDEX_MMAP})...")
+    index = read_index(faiss_index_path, mmap=RAG_INDEX_MMAP)
+    set_search_params(index, RAG_NPROBE, RAG_EF_SEARCH)
+    print(f"FAISS index loaded successfully. Total vectors: {index.ntotal}")
+
+    # **문서 저장소** (메모리 매핑 컬럼 저장소가 있으면 사용, 없으면 기존 index.pkl)
+    if use_mmap_docstore:
+        docs = MmapDocStore(docstore_directory)
+    else:
+        docs = PickleDocStore.load(metadata_path)
+    print(f"Docstore loaded: {type(docs).__name__} ({len(docs)} documents)")
+
+    # 근무지/마감일/직종 역색인 생성
+    job_index = JobIndex(index, embeddings, docs, ingest_run=read_watermark(watermark_path))
+    print(f"Metadata index built: {job_index.metadata.stats()}")
+    return job_index
+
+
+# 임베딩 모델 + 벡터 스토어는 처음 쓸 때 또는 warm-up 때 로드
+# (인덱스 파일이 없어도 API 전체가 죽지 않고 /rag 만 503 을 반환)
+rag_store = subsystems.register("rag", _load_vector_store)
+
+# **캐시 설정**
+# 질의 임베딩: 정규화한 프로필 텍스트 -> 벡터 (LRU)
+# 추천 결과: (프로필, 지역, 날짜, 직종) -> 추천 목록 (LRU + TTL, 인덱스를 다시 로드하면 비움)
+RAG_EMBEDDING_CACHE_SIZE = int(os.getenv("RAG_EMBEDDING_CACHE_SIZE", "1024"))
+RAG_RESULT_CACHE_SIZE = int(os.getenv("RAG_RESULT_CACHE_SIZE", "512"))
+RAG_RESULT_CACHE_TTL = float(os.getenv("RAG_RESULT_CACHE_TTL", "300"))
+
+embedding_cache = LRUCache(maxsize=RAG_EMBEDDING_CACHE_SIZE)
+recommendation_cache = LRUCache(maxsize=RAG_RESULT_CACHE_SIZE, ttl=RAG_RESULT_CACHE_TTL)
+rag_store.on_reload.append(recommendation_cache.clear)
+
+# **검색 실행 설정**
+# 임베딩 forward + FAISS 검색은 전용 스레드 풀에서, 동시 실행 수와 대기열을 제한 (넘치면 429)
+RAG_MAX_CONCURRENCY = int(os.getenv("RAG_MAX_CONCURRENCY", "2"))
+RAG_MAX_QUEUE = int(os.getenv("RAG_MAX_QUEUE", "32"))
+RAG_QUEUE_TIMEOUT = float(os.getenv("RAG_QUEUE_TIMEOUT", "2.0"))
+RAG_LOG_SAMPLE_RATE = float(os.getenv("RAG_LOG_SAMPLE_RATE", "0.01"))
+# 배치 요청 한 번에 받는 프로필 수 (한 요청이 검색 슬롯을 오래 붙잡지 않도록)
+RAG_MAX_BATCH_SIZE = int(os.getenv("RAG_MAX_BATCH_SIZE", "32"))
+
+# **증분 색인 설정**
+# RAG_INGEST_DB: datasets/job_ingest.py 가 쓰는 SQLite. 지정하면 주기적으로 변경분을 색인해서 교체
+RAG_INGEST_DB = os.getenv("RAG_INGEST_DB")
+RAG_INDEX_SYNC_SECONDS = float(os.getenv("RAG_INDEX_SYNC_SECONDS", "300"))
+RAG_INDEX_BATCH_SIZE = int(os.getenv("RAG_INDEX_BATCH_SIZE", "32"))
+index_sync_lock = asyncio.Lock()
+
+# **다양성 재순위 기본값** (요청마다 바꿀 수 있음)
+# fetch_k 개 후보를 가져와 같은 URL/제목 공고를 합치고 MMR 로 k 개를 고름
+RAG_MMR = os.getenv("RAG_MMR", "1") == "1"
+RAG_FETCH_K = int(os.getenv("RAG_FETCH_K", "50"))
+RAG_MMR_LAMBDA = float(os.getenv("RAG_MMR_LAMBDA", "0.5"))
+RAG_DEDUPE = os.getenv("RAG_DEDUPE", "url")  # url | title | none
+RAG_TOP_K = 5
+
+retrieval_executor = BoundedExecutor(
+    "rag-retrieval",
+    max_workers=RAG_MAX_CONCURRENCY,
+    max_queue=RAG_MAX_QUEUE,
+    queue_timeout=RAG_QUEUE_TIMEOUT,
+)
+
+
+def normalize_profile(profile):
+    """공백/줄바꿈/대소문자 차이만 있는 프로필을 같은 키로 취급"""
+    return " ".join(profile.split()).lower()
+
+
+def embed_profile(job_index, profile):
+    """
+    프로필 임베딩 (캐시에 있으면 모델 forward 생략)
+    캐시 키만 정규화하고, 모델에는 사용자가 입력한 원문을 그대로 넣음 (bge-m3 토크나이저는 대소문자 구분)
+    """
+    key = normalize_profile(profile)
+    vector = embedding_cache.get(key)
+    if vector is None:
+        vector = job_index.embeddings.embed_query(profile)
+        embedding_cache.set(key, vector)
+    return vector
+
+
+def embed_profiles(job_index, profiles):
+    """여러 프로필을 한 번의 embed_documents 호출로 임베딩 (캐시에 없는 것만, 키가 같으면 처음 원문으로 한 번)"""
+    keys = [normalize_profile(p) for p in profiles]
+    vectors = [embedding_cache.get(key) for key in keys]
+    missing = {}
+    for key, profile, vector in zip(keys, profiles, vectors):
+        if vector is None:
+            missing.setdefault(key, profile)
+    if missing:
+        embedded = dict(zip(missing, job_index.embeddings.embed_documents(list(missing.values()))))
+        for key, vector in embedded.items():
+            embedding_cache.set(key, vector)
+        vectors = [embedded.get(key, vector) for key, vector in zip(keys, vectors)]
+    return vectors
+
+
+def diversity_key(options):
+    return (options.mmr, options.fetch_k, options.lambda_mult, options.dedupe)
+
+
+def result_key(request):
+    return (normalize_profile(request.profile), request.area, request.date, request.job_class, *diversity_key(request))
+
+
+def candidate_ids(job_index, request):
+    """지역/마감일/직종 조건에 맞는 행 번호 (조건이 없으면 None = 전체 검색)"""
+    return job_index.metadata.candidate_ids(
+        area=request.area, date=request.date, job_class=request.job_class
     )
-    print(f"FAISS index loaded successfully. Total vectors: {vector_store.index.ntotal}")
-except Exception as e:
-    print(f"Error loading FAISS index: {str(e)}")
-    raise RuntimeError(f"Failed to load FAISS index: {str(e)}")
+
+
+def format_recommendation(doc):
+    metadata = doc.metadata
+    content = doc.page_content
+    content_lines = content.splitlines(keepends=True)
+
+    if content_lines and content_lines[0].startswith("채용제목"):
+        title = content_lines[0].removeprefix("채용제목: ").strip()
+        description = "".join(content_lines[1:])
+    else:
+        title = "제목 없음"
+        description = content
+
+    # 제목과 설명으로 변환
+    return {
+        "title": title,
+        "description": description,
+        "url": metadata.get("url")
+    }
+
 
 # **요청 데이터 모델**
-class RecommendationRequest(BaseModel):
+class DiversityOptions(BaseModel):
+    mmr: bool = RAG_MMR  # False 면 관련도 순 상위 k 개 그대로
+    fetch_k: int = Field(RAG_FETCH_K, ge=RAG_TOP_K, le=500)  # MMR/중복 제거 전에 가져올 후보 수
+    lambda_mult: float = Field(RAG_MMR_LAMBDA, ge=0.0, le=1.0)  # 1 이면 관련도만, 0 이면 다양성만
+    dedupe: Literal["url", "title", "none"] = RAG_DEDUPE
+
+
+class RecommendationRequest(DiversityOptions):
     profile: str
-    area: str = ""
-    date: str = datetime.now().strftime("%Y%m%d")
+    area: str = ""  # 예: "서울", "경기 성남시"
+    date: str = Field(default_factory=lambda: datetime.now().strftime("%Y%m%d"))  # 이 날짜에 마감된 공고 제외
+    job_class: str = ""
+
+
+class BatchRecommendationRequest(BaseModel):
+    requests: List[RecommendationRequest] = Field(..., max_length=RAG_MAX_BATCH_SIZE)
+
+
+def rank(job_index, vectors, ids, options):
+    """
+    질의 벡터들 -> 질의별 추천 Document 목록 (블로킹)
+    MMR 을 켜면 fetch_k 개 후보를 한 번의 행렬 검색으로 가져와 질의마다 중복 제거 + MMR
+    """
+    if not options.mmr:
+        return job_index.search(vectors, k=RAG_TOP_K, ids=ids)
+    found = job_index.search_ids(vectors, k=options.fetch_k, ids=ids)
+    return [
+        diverse_rerank(job_index, vector, rows, k=RAG_TOP_K, lambda_mult=options.lambda_mult, dedupe=options.dedupe)
+        for vector, rows in zip(vectors, found)
+    ]
+
+
+def retrieve(job_index, request):
+    """임베딩 + 검색 (블로킹, retrieval_executor 스레드에서 실행)"""
+    query_vector = embed_profile(job_index, request.profile)
+    docs = rank(job_index, [query_vector], candidate_ids(job_index, request), request)[0]
+    return [format_recommendation(doc) for doc in docs]
+
+
+def retrieve_batch(job_index, requests):
+    """여러 프로필을 embed_documents 한 번 + 필터 조건별 행렬 검색 한 번으로 처리 (블로킹)"""
+    vectors = embed_profiles(job_index, [r.profile for r in requests])
+
+    # 같은 필터/다양성 조건끼리 묶어서 행렬 검색 한 번씩
+    groups = {}
+    for i, (r, vector) in enumerate(zip(requests, vectors)):
+        groups.setdefault((r.area, r.date, r.job_class, *diversity_key(r)), []).append((i, vector))
+
+    results = [None] * len(requests)
+    for members in groups.values():
+        first = requests[members[0][0]]
+        found = rank(job_index, [v for _, v in members], candidate_ids(job_index, first), first)
+        for (i, _), docs in zip(members, found):
+            results[i] = [format_recommendation(doc) for doc in docs]
+    return results
+
+
+def log_sampled(message, *args):
+    """요청별 디버그 로그는 DEBUG 레벨이고 RAG_LOG_SAMPLE_RATE 비율로만 남김"""
+    if logger.isEnabledFor(logging.DEBUG) and random.random() < RAG_LOG_SAMPLE_RATE:
+        logger.debug(message, *args)
+
+
+async def run_retrieval(fn, *args):
+    try:
+        return await retrieval_executor.run(fn, *args)
+    except ExecutorSaturated as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
+
 
 @router.post("/recommend")
 async def recommend_jobs(request: RecommendationRequest):
     try:
-        print("Request received:", request)
-
-        # 검색기 생성
-        retriever = vector_store.as_retriever(
-            search_kwargs={
-                "k": 5,
-                "fetch_k": 50,
-            }
-        )
-        print("Retriever created successfully.")
-
-        # 검색 결과 확인
-        print("Attempting to retrieve relevant documents...")
-        docs = retriever.get_relevant_documents(request.profile)  # 동기 호출로 수정
-        if not docs:
-            print("No documents retrieved.")
-            return {"recommendations": []}
-        print(f"Retrieved {len(docs)} documents.")
-        print("Document contents:", docs)
-
-        # 결과 변환
-        formatted_recommendations = []
-        for doc in docs:
-            metadata = doc.metadata
-            content = doc.page_content
-            content_lines = content.splitlines(keepends=True)
-            
-            if content_lines[0].startswith("채용제목"):
-                title = content_lines[0].removeprefix("채용제목: ").strip()
-                description = "".join(content_lines[1:])
-            else:
-                title = "제목 없음"
-                description = content
-
-            # 제목과 설명으로 변환
-            recommendation = {
-                "title": title,
-                "description": description,
-                "url": metadata.get("url")
-            }
-            formatted_recommendations.append(recommendation)
-
-        print("Formatted recommendations:", formatted_recommendations)
+        job_index = await rag_store.aget()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    key = result_key(request)
+    cached = recommendation_cache.get(key)
+    if cached is not None:
+        return {"recommendations": cached}
 
+    try:
+        # 임베딩/검색은 전용 스레드에서 (이벤트 루프를 막지 않음)
+        formatted_recommendations = await run_retrieval(retrieve, job_index, request)
+        log_sampled("Recommendation for %r: %s", request, formatted_recommendations)
+
+        recommendation_cache.set(key, formatted_recommendations)
         return {"recommendations": formatted_recommendations}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error during document retrieval")
+        raise HTTPException(status_code=500, detail=f"RAG processing failed: {str(e)}")
+
+
+@router.post("/recommend/batch")
+async def recommend_jobs_batch(batch: BatchRecommendationRequest):
+    """
+    여러 프로필을 한 번에 추천
+    임베딩은 embed_documents 한 번, 검색은 행렬 입력 FAISS search 한 번으로 처리하고
+    결과는 요청 순서대로 반환
+    """
+    try:
+        job_index = await rag_store.aget()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    keys = [result_key(r) for r in batch.requests]
+    results = [recommendation_cache.get(key) for key in keys]
+    pending = [i for i, result in enumerate(results) if result is None]
+
+    try:
+        if pending:
+            found = await run_retrieval(retrieve_batch, job_index, [batch.requests[i] for i in pending])
+            for i, result in zip(pending, found):
+                results[i] = result
+                recommendation_cache.set(keys[i], result)
+        log_sampled("Batch recommendation: %d profiles, %d searched", len(keys), len(pending))
+        return {"results": [{"recommendations": result} for result in results]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error during batch retrieval")
+        raise HTTPException(status_code=500, detail=f"RAG processing failed: {str(e)}")
+
+
+def search_vector(job_index, vector, area, date, job_class, options):
+    """저장된 프로필 임베딩으로 검색만 (블로킹)"""
+    ids = job_index.metadata.candidate_ids(area=area, date=date, job_class=job_class)
+    docs = rank(job_index, [vector], ids, options)[0]
+    return [format_recommendation(doc) for doc in docs]
+
+
+@router.get("/recommend/{user_id}")
+async def recommend_jobs_for_user(
+    user_id: str,
+    area: str = "",
+    date: str = "",
+    job_class: str = "",
+    options: DiversityOptions = Depends(),
+    user: dict = Depends(current_user),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    User 의 프로필 필드(희망 직종/근무지, 기술, 경력, 자격증)로 추천
+    미리 계산해 둔 프로필 임베딩을 쓰므로 FAISS 검색만 수행 (없으면 이번에 계산해서 저장)
+    로그인한 본인의 추천만 조회 가능 (Authorization: Bearer <token>)
+    """
+    if user["id"] != user_id:
+        raise HTTPException(status_code=403, detail="Not allowed to view another user's recommendations")
+
+    try:
+        job_index = await rag_store.aget()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    profile = await profile_embeddings.load_profile(db, user_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    if not profile[0]:
+        raise HTTPException(status_code=400, detail="Profile fields are empty")
+    date = date or datetime.now().strftime("%Y%m%d")
+
+    key = ("user", profile[1], area, date, job_class, *diversity_key(options))
+    cached = recommendation_cache.get(key)
+    if cached is not None:
+        return {"recommendations": cached}
+
+    try:
+        name = profile_embeddings.model_name(job_index)
+        vector = await profile_embeddings.stored_embedding(db, user_id, name, profile[1])
+        await db.close()  # 검색(과 임베딩 계산) 동안 요청 커넥션을 풀에 돌려줌
+        if vector is None:
+            vector = await profile_embeddings.refresh(user_id, job_index)
+        if vector is None:  # 그 사이 프로필이 비워짐
+            raise HTTPException(status_code=400, detail="Profile fields are empty")
+        recommendations = await run_retrieval(search_vector, job_index, vector, area, date, job_class, options)
+        recommendation_cache.set(key, recommendations)
+        return {"recommendations": recommendations}
+    except HTTPException:
+        raise
     except Exception as e:
-        print("Error during document retrieval:", str(e))
+        logger.exception("Error during user recommendation")
         raise HTTPException(status_code=500, detail=f"RAG processing failed: {str(e)}")
+
+
+async def sync_ingested_postings():
+    """수집 DB 의 새/변경/마감 공고를 반영한 인덱스로 교체 (검색 중인 요청은 기존 인덱스로 끝까지 처리)"""
+    async with index_sync_lock:
+        job_index = await rag_store.aget()
+        today = datetime.now().strftime("%Y%m%d")
+        updated, summary = await asyncio.to_thread(
+            sync_index, job_index, RAG_INGEST_DB, today, RAG_INDEX_BATCH_SIZE
+        )
+        summary["swapped"] = updated is not None and rag_store.swap(updated, expected=job_index)
+        if summary["swapped"]:
+            logger.info("Index synced from ingest feed: %s", summary)
+        return summary
+
+
+async def index_sync_loop():
+    """RAG_INDEX_SYNC_SECONDS 마다 증분 색인 (main.py lifespan 에서 시작)"""
+    while True:
+        await asyncio.sleep(RAG_INDEX_SYNC_SECONDS)
+        try:
+            await sync_ingested_postings()
+        except Exception:
+            logger.exception("Incremental index sync failed")
+
+
+@router.post("/index/sync")
+async def sync_index_now():
+    """증분 색인을 바로 실행"""
+    if not RAG_INGEST_DB:
+        raise HTTPException(status_code=400, detail="RAG_INGEST_DB is not configured")
+    try:
+        return await sync_ingested_postings()
+    except RuntimeError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
+@router.post("/reload")
+async def reload_index():
+    """FAISS 인덱스를 다시 로드 (추천 결과 캐시도 비움)"""
+    try:
+        job_index = await asyncio.to_thread(rag_store.reload)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Index reload failed: {str(e)}")
+    return {"message": "Index reloaded", "total_vectors": job_index.ntotal}
+
+
+@router.get("/cache/stats")
+async def cache_stats():
+    """임베딩/추천 결과 캐시의 hit, miss, eviction 횟수"""
+    return {
+        "embedding_cache": embedding_cache.stats(),
+        "recommendation_cache": recommendation_cache.stats(),
+    }
+
+
+@router.get("/stats")
+async def retrieval_stats():
+    """검색 전용 스레드 풀의 실행/대기/거절 수, 인덱스(기본/delta/삭제) 크기"""
+    stats = {"executor": retrieval_executor.stats()}
+    if rag_store.ready:
+        stats["index"] = rag_store.value.stats()
+    return stats
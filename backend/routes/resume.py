@@ -1,69 +1,88 @@
 from fastapi import APIRouter, UploadFile, File
 from fastapi.responses import JSONResponse
-from langchain_community.document_loaders import Docx2txtLoader, PyPDFLoader
-from langchain_community.llms import OpenAI
-from langchain.chains.summarize import load_summarize_chain
-from langchain.prompts import PromptTemplate
 import os
-import tempfile
+from concurrent.futures.process import BrokenProcessPool
 from dotenv import load_dotenv
+from ..services.resume_parser import LOADERS, ParseTimeout, ResumeParser, UploadTooLarge, save_upload
+from ..services.summarizer import summarizer
 
 router = APIRouter()
 
 # 환경 변수 로드
 load_dotenv()
 
+# **업로드/파싱 설정**
+RESUME_MAX_UPLOAD_MB = float(os.getenv("RESUME_MAX_UPLOAD_MB", "10"))
+RESUME_PARSE_WORKERS = int(os.getenv("RESUME_PARSE_WORKERS", "2"))
+RESUME_PARSE_TIMEOUT = float(os.getenv("RESUME_PARSE_TIMEOUT", "30"))
+RESUME_TEXT_CACHE_SIZE = int(os.getenv("RESUME_TEXT_CACHE_SIZE", "256"))
+
+resume_parser = ResumeParser(
+    max_workers=RESUME_PARSE_WORKERS, timeout=RESUME_PARSE_TIMEOUT, cache_size=RESUME_TEXT_CACHE_SIZE
+)
+
 
 @router.post("/upload")
 async def upload_resume(file: UploadFile = File(...)):
-    with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-        contents = await file.read()
-        tmp_file.write(contents)
-        tmp_file_name = tmp_file.name
-
-    loader = None
-    if file.filename.endswith(".pdf"):
-        loader = PyPDFLoader(tmp_file_name)
-    elif file.filename.endswith(".docx"):
-        loader = Docx2txtLoader(tmp_file_name)
-    else:
-        os.remove(tmp_file_name)
+    kind = LOADERS.get(os.path.splitext(file.filename or "")[1].lower())
+    if kind is None:
         return JSONResponse(content={"error": "Unsupported file type"}, status_code=400)
 
-    documents = loader.load()
-    os.remove(tmp_file_name)
-
-    # Summarize the document
-    openai_api_key = os.getenv("OPENAI_API_KEY")
-    llm = OpenAI(temperature=0.7, openai_api_key=openai_api_key)
+    # 청크 단위로 디스크에 저장, 파싱은 프로세스 풀에서 (이벤트 루프를 막지 않음)
+    try:
+        tmp_file_name, digest = await save_upload(file, int(RESUME_MAX_UPLOAD_MB * 1024 * 1024))
+    except UploadTooLarge:
+        return JSONResponse(content={"error": f"File is larger than {RESUME_MAX_UPLOAD_MB:g}MB"}, status_code=413)
+    try:
+        pages = await resume_parser.parse(tmp_file_name, kind, digest)
+    except ParseTimeout:
+        return JSONResponse(content={"error": "Document parsing timed out"}, status_code=504)
+    except BrokenProcessPool:
+        return JSONResponse(content={"error": "Document parser is restarting, try again"}, status_code=503)
+    except Exception:
+        return JSONResponse(content={"error": "Could not read the document"}, status_code=422)
+    finally:
+        os.remove(tmp_file_name)
 
-    prompt_template = """
-    다음 내용을 한 문장으로 요약하세요:
-    {text}
-    요약:"""
-    PROMPT = PromptTemplate(template=prompt_template, input_variables=["text"])
-    chain = load_summarize_chain(llm, chain_type="stuff", prompt=PROMPT)
-    summary = chain.run(documents)
+    # 요약 (LLM 클라이언트 재사용, 긴 문서는 map-reduce, 같은 문서는 캐시)
+    try:
+        resume_summarizer = await summarizer.aget()
+    except RuntimeError as e:
+        return JSONResponse(content={"error": str(e)}, status_code=503)
+    summary = await resume_summarizer.summarize([content for content, _ in pages], doc_hash=digest)
 
     return {"summary": summary}
 
 
+@router.get("/upload/stats")
+async def upload_stats():
+    """파싱 프로세스 풀 / 추출 텍스트 캐시 / 요약 캐시 상태"""
+    stats = {"parser": resume_parser.stats()}
+    if summarizer.ready:
+        stats["summarizer"] = summarizer.value.stats()
+    return stats
+
+
 ########################################################################
 
 # 이력서 작성 코드
 
-from fastapi import APIRouter, HTTPException, Form, UploadFile, File
-from sqlalchemy.orm import Session
-from ..database import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, Form, UploadFile, File
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from urllib.parse import quote
+from ..database import AsyncSessionLocal, get_db
 from ..models import User
+from ..services.profile_embeddings import schedule_refresh
+from ..services.resume_files import RESUME_KINDS, get_resume_file, iter_resume_file, list_resume_files, save_resume_file
 from typing import Optional
 
 # router = APIRouter()
 
 @router.get("/resume/{user_id}")
-async def get_resume(user_id: str):
-    db: Session = SessionLocal()
-    user = db.query(User).filter(User.id == user_id).first()
+async def get_resume(user_id: str, db: AsyncSession = Depends(get_db)):
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return {
@@ -75,7 +94,31 @@ async def get_resume(user_id: str):
         "skills": user.skills,
         "desired_position": user.desired_position,
         "desired_location": user.desired_location,
+        "resume_files": await list_resume_files(db, user_id),
+    }
+
+
+@router.get("/resume/{user_id}/file/{kind}")
+async def download_resume_file(user_id: str, kind: str, db: AsyncSession = Depends(get_db)):
+    """
+    이력서 파일 다운로드 (kind: pdf | word). DB 에서 조각씩 읽어서 스트리밍
+    (스트리밍은 요청 세션이 닫힌 뒤에도 이어지므로 별도 세션 사용)
+    """
+    if kind not in RESUME_KINDS:
+        raise HTTPException(status_code=400, detail="kind must be pdf or word")
+    resume_file = await get_resume_file(db, user_id, kind)
+    if not resume_file:
+        raise HTTPException(status_code=404, detail="Resume file not found")
+    headers = {
+        "Content-Length": str(resume_file.size),
+        "ETag": f'"{resume_file.sha256}"',
+        "Content-Disposition": f"attachment; filename*=UTF-8''{quote(resume_file.filename or f'resume_{kind}')}",
     }
+    return StreamingResponse(
+        iter_resume_file(AsyncSessionLocal, resume_file.id, resume_file.size),
+        media_type=resume_file.content_type,
+        headers=headers,
+    )
 
 @router.post("/resume")
 async def create_resume(
@@ -106,9 +149,9 @@ async def update_resume(
     desired_location: Optional[str] = Form(None),
     resume_pdf: UploadFile = File(None),
     resume_word: UploadFile = File(None),
+    db: AsyncSession = Depends(get_db),
 ):
-    db: Session = SessionLocal()
-    user = db.query(User).filter(User.id == user_id).first()
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -121,8 +164,13 @@ async def update_resume(
     user.skills = skills
     user.desired_position = desired_position
     user.desired_location = desired_location
+    for kind, upload in (("pdf", resume_pdf), ("word", resume_word)):
+        if upload:
+            await save_resume_file(db, user_id, kind, await upload.read(), upload.filename, upload.content_type)
 
-    db.commit()
+    await db.commit()
+    # 프로필이 바뀌었으면 추천용 임베딩을 백그라운드에서 다시 계산
+    schedule_refresh(user_id)
     return {"message": "Resume updated successfully"}
 
 
@@ -1,21 +1,33 @@
 from fastapi import APIRouter, Request
-from fastapi.responses import JSONResponse, HTMLResponse
-from gtts import gTTS
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain
-from langchain.llms import OpenAI
+from fastapi.responses import FileResponse, JSONResponse, HTMLResponse, RedirectResponse, Response, StreamingResponse
+import asyncio
 import os
+from typing import Optional
+from ..services.llm_gateway import gateway
+from ..services.question_store import question_store
+from ..services.tts_audio import TTS_LANG, TTS_VOICE, audio_cache
 
 router = APIRouter()
 
-# 면접 질문 저장
-generated_questions = []
+# 캐시 음성은 내용 해시가 파일 이름이라 내용이 절대 바뀌지 않음 -> 브라우저/프록시가 오래 캐시
+AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+QUESTION_PROMPT = """
+            다음 채용공고를 기반으로 구직자의 역량을 평가할 수 있는 면접 질문 3개를 한국어로 생성하세요:
+            
+            채용공고:
+            {job_description}
+
+            면접 질문:
+            """
+
 @router.post("/generate_questions_for_job")
 async def generate_questions_for_job(request: Request):
     """
     특정 일자리 데이터를 기반으로 면접 질문 생성
+    질문은 새 면접 세션에 저장하고 session_id 를 함께 반환 (GET /tts/{i}?session_id=... 로 조회)
+    audio_urls: 질문별 내용 주소 음성 URL (/tts/audio/<해시>.mp3, 합성이 끝난 뒤부터 존재)
     """
-    global generated_questions  # 전역 리스트 참조
     try:
         body = await request.json()
         job_description = body.get("job_description")
@@ -23,72 +35,122 @@ async def generate_questions_for_job(request: Request):
         if not job_description:
             return JSONResponse(content={"error": "Job description is required."}, status_code=400)
 
-        openai_api_key = os.getenv("OPENAI_API_KEY")
-        if not openai_api_key:
-            return JSONResponse(content={"error": "API 키가 설정되지 않았습니다."}, status_code=500)
-
-        llm = OpenAI(temperature=0.7, openai_api_key=openai_api_key)
-
-        prompt_template = PromptTemplate(
-            input_variables=["job_description"],
-            template="""
-            다음 채용공고를 기반으로 구직자의 역량을 평가할 수 있는 면접 질문 3개를 한국어로 생성하세요:
-            
-            채용공고:
-            {job_description}
+        try:
+            llm = await gateway.aget()
+        except RuntimeError as e:
+            return JSONResponse(content={"error": str(e)}, status_code=503)
 
-            면접 질문:
-            """
-        )
-
-        chain = LLMChain(llm=llm, prompt=prompt_template)
-        questions = chain.run({"job_description": job_description}).split("\n")
+        # 같은 공고의 질문은 캐시 / 동시에 들어온 같은 요청은 한 번만 호출
+        questions = (
+            await llm.complete(QUESTION_PROMPT, {"job_description": job_description}, temperature=0.7)
+        ).split("\n")
 
-        # 전역 리스트에 저장
+        # 면접 세션에 저장 (사용자/워커마다 따로)
         generated_questions = [q.strip("- ") for q in questions if q.strip()]
+        session_id = await asyncio.to_thread(question_store.create, generated_questions)
+        # 질문 음성을 백그라운드에서 미리 합성
+        audio_cache.pregenerate(generated_questions, TTS_LANG, TTS_VOICE)
+
+        audio_urls = [
+            f"/tts/audio/{audio_cache.file_name(question, TTS_LANG, TTS_VOICE)}" for question in generated_questions
+        ]
 
-        return {"questions": generated_questions}
+        return {"session_id": session_id, "questions": generated_questions, "audio_urls": audio_urls}
 
     except Exception as e:
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
+@router.get("/llm/stats")
+async def llm_stats():
+    """LLM 호출 수 / 캐시 적중 / 합쳐진 요청 / 토큰 수 / 지연시간"""
+    if not gateway.ready:
+        return {"status": gateway.state}
+    return gateway.value.stats()
+
+
+@router.get("/audio/stats")
+async def audio_stats():
+    """TTS 음성 캐시 파일 수 / 크기 / 적중 / 합성 / 삭제"""
+    return audio_cache.stats()
+
+
+@router.get("/sessions/stats")
+async def session_stats():
+    """면접 세션 저장소 상태"""
+    return await asyncio.to_thread(question_store.stats)
+
+
+@router.get("/audio/{file_name}")
+async def serve_audio(file_name: str, request: Request):
+    """
+    내용 주소 방식 캐시 음성 (ETag = 내용 해시, Range 요청 지원)
+    한 번 받은 뒤에는 브라우저나 앞단 프록시 캐시에서 재생되어 여기까지 오지 않음
+    """
+    file_path = audio_cache.cached_path(file_name)
+    if file_path is None:
+        return JSONResponse(content={"error": "File not found"}, status_code=404)
+    headers = {"ETag": f'"{file_name[:-len(".mp3")]}"', "Cache-Control": AUDIO_CACHE_CONTROL}
+    if request.headers.get("if-none-match") in (headers["ETag"], "*"):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(file_path, media_type="audio/mpeg", headers=headers)
+
+
+async def session_question(session_id, question_index):
+    """(질문 텍스트, 오류 응답) 중 하나"""
+    if not session_id:
+        return None, JSONResponse(content={"error": "session_id is required."}, status_code=400)
+    questions = await asyncio.to_thread(question_store.get, session_id)
+    if not questions:
+        return None, JSONResponse(content={"error": "Interview session not found or expired."}, status_code=404)
+    if question_index < 0 or question_index >= len(questions):
+        return None, JSONResponse(
+            content={
+                "error": f"Invalid question index. Received: {question_index}, but list length is {len(questions)}."
+            },
+            status_code=400,
+        )
+    return questions[question_index], None
+
+
+@router.get("/{question_index}/stream")
+async def stream_question_audio(question_index: int, session_id: Optional[str] = None):
+    """
+    질문 음성을 합성되는 대로 스트리밍 (합성이 끝나기 전에 재생 시작)
+    이미 캐시된 음성이면 캐시 가능한 /tts/audio/... 로 리다이렉트
+    """
+    question_text, error = await session_question(session_id, question_index)
+    if error is not None:
+        return error
+
+    file_name = audio_cache.file_name(question_text, TTS_LANG, TTS_VOICE)
+    if audio_cache.cached_path(file_name) is not None:
+        return RedirectResponse(f"/tts/audio/{file_name}", status_code=307)
+    return StreamingResponse(
+        audio_cache.stream(question_text, TTS_LANG, TTS_VOICE),
+        media_type="audio/mpeg",
+        headers={"Cache-Control": "no-store"},
+    )
+
+
 @router.get("/{question_index}")
-async def tts_page(question_index: int):
+async def tts_page(question_index: int, session_id: Optional[str] = None):
     """
-    특정 질문의 텍스트를 음성 파일로 변환하고 파일 URL을 반환
+    면접 세션의 특정 질문을 음성 파일로 변환하고 파일 URL을 반환
     """
-    global generated_questions
     try:
-        if not generated_questions:
-            return JSONResponse(
-                content={"error": "No questions have been generated yet."}, status_code=400
-            )
-
-        if question_index < 0 or question_index >= len(generated_questions):
-            return JSONResponse(
-                content={
-                    "error": f"Invalid question index. Received: {question_index}, but list length is {len(generated_questions)}."
-                },
-                status_code=400,
-            )
-
-        question_text = generated_questions[question_index]
-
-        # TTS 음성 생성
-        tts = gTTS(text=question_text, lang="ko")
-        static_dir = "static"
-        if not os.path.exists(static_dir):
-            os.makedirs(static_dir)
-
-        tts_file = f"{static_dir}/question_{question_index}.mp3"
-        tts.save(tts_file)
-
-        # 파일 URL 반환
+        question_text, error = await session_question(session_id, question_index)
+        if error is not None:
+            return error
+
+        # TTS 음성 (텍스트/언어/음성 해시로 캐시, 없으면 합성)
+        tts_file = await audio_cache.ensure(question_text, TTS_LANG, TTS_VOICE)
+
+        # 파일 URL 반환 (캐시 헤더가 붙는 /tts/audio/<해시>.mp3)
         return JSONResponse(
             content={
                 "question_text": question_text,
-                "audio_file": f"/static/question_{question_index}.mp3",
+                "audio_file": f"/tts/audio/{os.path.basename(tts_file)}",
             },
             status_code=200,
         )
@@ -97,9 +159,6 @@ async def tts_page(question_index: int):
         return JSONResponse(content={"error": str(e)}, status_code=500)
 
 
-
-from fastapi.responses import FileResponse
-
 @router.get("/static/{file_name}")
 async def serve_file(file_name: str):
     file_path = f"static/{file_name}"
@@ -0,0 +1,129 @@
+"""
+관련도 순 상위 k 검색과 fetch_k 후보 + 중복 제거 + MMR 재순위의 지연시간·다양성 비교
+
+사용법:
+    python -m backend.scripts.benchmark_mmr <faiss_index_dir> --fetch-k 20 50 100 --lambda-mult 0.5
+    python -m backend.scripts.benchmark_mmr --synthetic 100000   # 인덱스 없이 합성 데이터로
+
+저장된 벡터에 약간의 잡음을 섞어 질의로 쓰고, 설정마다 질의당 p50/p99 지연시간(ms)과
+결과 k 개 중 URL/제목이 겹치는 비율(dup_url / dup_title), 결과끼리의 평균 코사인 유사도(pair_sim)를 출력한다.
+합성 데이터는 같은 공고를 여러 기관이 올린 것처럼 거의 같은 벡터·제목 묶음을 만든다.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from backend.services.ann_index import all_vectors, read_index
+from backend.services.doc_store import MmapDocStore, PickleDocStore
+from backend.services.job_search import JobIndex
+from backend.services.mmr import dedupe_key, diverse_rows
+
+
+def load_index(index_dir, index_file):
+    index = read_index(os.path.join(index_dir, index_file), mmap=False)
+    docstore_dir = os.path.join(index_dir, "docstore")
+    if os.path.exists(os.path.join(docstore_dir, "manifest.json")):
+        docs = MmapDocStore(docstore_dir)
+    else:
+        docs = PickleDocStore.load(os.path.join(index_dir, "index.pkl"))
+    return JobIndex(index, None, docs)
+
+
+def synthetic_index(size, dim, copies, seed=0):
+    """copies 개씩 거의 같은 벡터/제목/URL(기관만 다름)을 가진 합성 공고"""
+    import faiss
+    from langchain_community.docstore.in_memory import InMemoryDocstore
+    from langchain_core.documents import Document
+
+    rng = np.random.default_rng(seed)
+    jobs = size // copies
+    centers = rng.normal(size=(jobs, dim)).astype(np.float32)
+    vectors = np.repeat(centers, copies, axis=0) + rng.normal(0, 0.05, size=(jobs * copies, dim)).astype(np.float32)
+    faiss.normalize_L2(vectors)
+    index = faiss.IndexFlatIP(dim)
+    index.add(vectors)
+
+    documents = {}
+    for row in range(len(vectors)):
+        job, agency = divmod(row, copies)
+        documents[str(row)] = Document(
+            page_content=f"채용제목: 공고 {job} (기관{agency})\n근무지: 서울",
+            # 같은 공고의 절반은 같은 URL 로 중복 게시
+            metadata={"url": f"https://example.com/jobs/{job}/{agency % max(copies // 2, 1)}"},
+        )
+    docs = PickleDocStore(InMemoryDocstore(documents), {row: str(row) for row in range(len(vectors))})
+    return JobIndex(index, None, docs)
+
+
+def diversity(job_index, docs, rows):
+    """결과 목록의 URL/제목 중복 비율과 결과끼리의 평균 코사인 유사도"""
+    k = len(docs)
+    if k < 2:
+        return 0.0, 0.0, 0.0
+    dup = [1 - len({dedupe_key(doc, by) for doc in docs}) / k for by in ("url", "title")]
+    vectors = job_index.vectors(rows)
+    if vectors is None:
+        return dup[0], dup[1], float("nan")
+    vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    similarity = vectors @ vectors.T
+    return dup[0], dup[1], float((similarity.sum() - k) / (k * (k - 1)))
+
+
+def run(job_index, queries, k, fetch_k=None, lambda_mult=0.5, dedupe="url"):
+    latencies = []
+    metrics = []
+    for query in queries:
+        started = time.perf_counter()
+        if fetch_k is None:
+            rows = [row for row in job_index.search_ids([query], k=k)[0] if row != -1]
+            docs = [job_index.document(row) for row in rows]
+        else:
+            found = job_index.search_ids([query], k=fetch_k)[0]
+            rows, docs = diverse_rows(job_index, query, found, k=k, lambda_mult=lambda_mult, dedupe=dedupe)
+        latencies.append((time.perf_counter() - started) * 1000)
+        metrics.append(diversity(job_index, docs, rows))
+    return np.array(latencies), np.array(metrics)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("index_dir", nargs="?", help="index.faiss 와 index.pkl 또는 docstore/ 가 있는 폴더")
+    parser.add_argument("--index-file", default="index.faiss")
+    parser.add_argument("--synthetic", type=int, help="인덱스 대신 이 개수의 합성 공고 사용")
+    parser.add_argument("--dim", type=int, default=1024, help="합성 데이터 벡터 차원")
+    parser.add_argument("--copies", type=int, default=4, help="합성 데이터에서 같은 공고의 중복 게시 수")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--fetch-k", type=int, nargs="+", default=[20, 50, 100])
+    parser.add_argument("--lambda-mult", type=float, default=0.5)
+    parser.add_argument("--dedupe", choices=["url", "title", "none"], default="url")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        job_index = synthetic_index(args.synthetic, args.dim, args.copies)
+    elif args.index_dir:
+        job_index = load_index(args.index_dir, args.index_file)
+    else:
+        parser.error("index_dir 또는 --synthetic 을 지정하세요")
+    print(f"{job_index.ntotal} vectors, dim={job_index.index.d}")
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(job_index.ntotal, size=min(args.queries, job_index.ntotal), replace=False)
+    queries = job_index.vectors(sample)
+    if queries is None:
+        queries = all_vectors(job_index.index)[sample]
+    queries = queries + rng.normal(0, 0.01, size=queries.shape).astype(np.float32)
+
+    configs = [("top-k", None)] + [(f"mmr@{fetch_k}", fetch_k) for fetch_k in args.fetch_k]
+    print(f"{'config':<10} {'p50(ms)':>9} {'p99(ms)':>9} {'dup_url':>8} {'dup_title':>10} {'pair_sim':>9}")
+    for name, fetch_k in configs:
+        latencies, metrics = run(job_index, queries, args.k, fetch_k, args.lambda_mult, args.dedupe)
+        p50, p99 = np.percentile(latencies, [50, 99])
+        dup_url, dup_title, pair_sim = metrics.mean(axis=0)
+        print(f"{name:<10} {p50:>9.2f} {p99:>9.2f} {dup_url:>8.3f} {dup_title:>10.3f} {pair_sim:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
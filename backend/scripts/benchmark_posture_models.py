@@ -0,0 +1,94 @@
+"""
+자세 분석 모델 변형(float32 / float16 / int8) 정확도·지연시간 비교
+
+사용법:
+    python -m backend.scripts.benchmark_posture_models <frames_dir> \
+        --model float32=models/model_unquant.tflite \
+        --model int8=models/model_int8.tflite
+
+frames_dir 는 클래스 이름별 하위 폴더에 JPEG 프레임을 둔다.
+    frames_dir/confident/*.jpg
+    frames_dir/unconfident/*.jpg
+
+각 변형에 대해 float 모델(첫 번째 --model)과의 예측 일치율, 라벨 정확도,
+프레임당 p50/p99 지연시간(ms)을 출력한다.
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from backend.services.interpreter_pool import get_input_spec, invoke_interpreter, load_interpreter
+from backend.services.posture_frames import FrameBuffer
+from backend.services.posture_model import class_names
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png")
+
+
+def load_frames(frames_dir):
+    frames = []
+    for label in class_names:
+        label_dir = os.path.join(frames_dir, label)
+        if not os.path.isdir(label_dir):
+            continue
+        for name in sorted(os.listdir(label_dir)):
+            if name.lower().endswith(IMAGE_EXTENSIONS):
+                with open(os.path.join(label_dir, name), "rb") as f:
+                    frames.append((f.read(), class_names.index(label)))
+    return frames
+
+
+def run_variant(model_path, frames, num_threads, warmup):
+    interpreter = load_interpreter(model_path, num_threads)
+    buffer = FrameBuffer(input_spec=get_input_spec(interpreter))
+
+    predictions = []
+    latencies = []
+    for i, (data, _) in enumerate(frames):
+        if not buffer.load_jpeg(data):
+            predictions.append(-1)
+            continue
+        started = time.perf_counter()
+        output = invoke_interpreter(interpreter, np.expand_dims(buffer.to_input(), axis=0))
+        elapsed = time.perf_counter() - started
+        if i >= warmup:
+            latencies.append(elapsed * 1000)
+        predictions.append(int(np.argmax(output[0])))
+    return np.array(predictions), np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("frames_dir")
+    parser.add_argument(
+        "--model",
+        action="append",
+        required=True,
+        help="name=path 형식. 첫 번째 모델을 기준(float) 모델로 사용",
+    )
+    parser.add_argument("--num-threads", type=int, default=1)
+    parser.add_argument("--warmup", type=int, default=5, help="지연시간 집계에서 제외할 앞쪽 프레임 수")
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames_dir)
+    if not frames:
+        raise SystemExit(f"No labelled frames found under {args.frames_dir}")
+    labels = np.array([label for _, label in frames])
+    print(f"{len(frames)} frames loaded from {args.frames_dir}")
+
+    variants = [spec.split("=", 1) for spec in args.model]
+    reference = None
+    print(f"{'variant':<10} {'agreement':>10} {'accuracy':>10} {'p50(ms)':>9} {'p99(ms)':>9}")
+    for name, path in variants:
+        predictions, latencies = run_variant(path, frames, args.num_threads, args.warmup)
+        if reference is None:
+            reference = predictions
+        agreement = np.mean(predictions == reference)
+        accuracy = np.mean(predictions == labels)
+        p50, p99 = np.percentile(latencies, [50, 99]) if len(latencies) else (0.0, 0.0)
+        print(f"{name:<10} {agreement:>10.4f} {accuracy:>10.4f} {p50:>9.2f} {p99:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+정확(Flat) FAISS 인덱스의 벡터로 근사 최근접(IVF-PQ / HNSW) 인덱스 생성
+
+사용법:
+    python -m backend.scripts.build_ann_index <faiss_index_dir> --kind hnsw --ef-search 32 64 128
+    python -m backend.scripts.build_ann_index <faiss_index_dir> --kind ivfpq --nlist 1024 --nprobe 8 16 32
+
+검색 파라미터(nprobe / efSearch) 후보마다 정확 인덱스 대비 recall@k, 전체의 10% / 1% 행만 허용하는
+필터 검색의 recall(filter@10%, filter@1%), 질의 지연시간을 출력하고,
+--target-recall 을 만족하는 가장 빠른 값을 인덱스 파일 옆 .json 에 저장한다.
+API 는 RAG_INDEX_FILE=<output> 으로 이 인덱스를 메모리 매핑해서 로드한다.
+"""
+import argparse
+import json
+import os
+
+import faiss
+import numpy as np
+
+from backend.services.ann_index import (
+    all_vectors,
+    build_index,
+    enable_reconstruct,
+    evaluate,
+    params_path,
+    set_search_params,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("index_dir", help="index.faiss / index.pkl 이 있는 폴더")
+    parser.add_argument("--kind", choices=["hnsw", "ivfpq"], default="hnsw")
+    parser.add_argument("--output", help="출력 파일 이름 (기본: index_<kind>.faiss)")
+    parser.add_argument("--nlist", type=int, default=1024)
+    parser.add_argument("--pq-m", type=int, default=16, help="PQ 서브벡터 수 (차원의 약수)")
+    parser.add_argument("--pq-bits", type=int, default=8)
+    parser.add_argument("--hnsw-m", type=int, default=32)
+    parser.add_argument("--ef-construction", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128])
+    parser.add_argument("--queries", type=int, default=1000, help="평가에 쓸 질의 수 (저장된 벡터에서 샘플링)")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    args = parser.parse_args()
+
+    exact = faiss.read_index(os.path.join(args.index_dir, "index.faiss"))
+    vectors = all_vectors(exact)
+    print(f"{exact.ntotal} vectors, dim={exact.d}")
+
+    index = build_index(
+        vectors,
+        kind=args.kind,
+        metric=exact.metric_type,
+        nlist=args.nlist,
+        pq_m=args.pq_m,
+        pq_bits=args.pq_bits,
+        hnsw_m=args.hnsw_m,
+        ef_construction=args.ef_construction,
+    )
+    enable_reconstruct(index)  # 필터 후보가 적을 때의 직접 계산 경로도 API 와 같게 평가
+
+    # 저장된 벡터에 약간의 잡음을 섞어 질의로 사용
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = vectors[sample] + rng.normal(0, 0.01, size=(len(sample), exact.d)).astype(np.float32)
+
+    param_name = "nprobe" if args.kind == "ivfpq" else "ef_search"
+    candidates = args.nprobe if args.kind == "ivfpq" else args.ef_search
+    chosen = None
+    print(
+        f"{param_name:>10} {'recall@' + str(args.k):>10} {'filter@10%':>11} {'filter@1%':>10} "
+        f"{'p50(ms)':>9} {'p99(ms)':>9}"
+    )
+    for value in candidates:
+        set_search_params(index, **{param_name: value})
+        result = evaluate(exact, index, queries, k=args.k, filter_ratios=(0.1, 0.01))
+        filtered = result["filtered_recall"]
+        print(
+            f"{value:>10} {result['recall']:>10.4f} {filtered[0.1]:>11.4f} {filtered[0.01]:>10.4f} "
+            f"{result['p50_ms']:>9.3f} {result['p99_ms']:>9.3f}"
+        )
+        if chosen is None and result["recall"] >= args.target_recall:
+            chosen = value
+    if chosen is None:
+        chosen = candidates[-1]
+        print(f"No {param_name} reached recall {args.target_recall}; using {chosen}")
+
+    output = os.path.join(args.index_dir, args.output or f"index_{args.kind}.faiss")
+    faiss.write_index(index, output)
+    with open(params_path(output), "w") as f:
+        json.dump({"kind": args.kind, param_name: chosen}, f)
+    print(f"Saved {output} ({param_name}={chosen})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+LangChain FAISS 의 index.pkl (pickle docstore) 을 메모리 매핑 컬럼 저장소로 변환
+
+사용법:
+    python -m backend.scripts.convert_docstore <faiss_index_dir>
+
+<faiss_index_dir>/docstore/ 에 컬럼 파일을 만들고, API 는 다음 로드부터 이 저장소를 사용한다
+(RAG_DOCSTORE=auto).
+"""
+import argparse
+import os
+import time
+
+from backend.services.doc_store import MmapDocStore, PickleDocStore, write_doc_store
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("index_dir", help="index.pkl 이 있는 폴더")
+    parser.add_argument("--output", help="출력 폴더 (기본: <index_dir>/docstore)")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.index_dir, "docstore")
+    started = time.perf_counter()
+    source = PickleDocStore.load(os.path.join(args.index_dir, "index.pkl"))
+    write_doc_store(output, source.export_rows(), source.size)
+
+    # 변환 결과 검증: 모든 행의 본문과 메타데이터가 같은지 확인
+    converted = MmapDocStore(output)
+    for row, doc in source.rows():
+        copy = converted.document(row)
+        if copy is None or copy.page_content != doc.page_content or copy.metadata != doc.metadata:
+            raise SystemExit(f"Mismatch at row {row}")
+    print(f"Converted {len(source)} documents to {output} in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
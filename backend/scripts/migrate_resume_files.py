@@ -0,0 +1,68 @@
+"""
+users.resume_pdf / users.resume_word (LargeBinary) 를 resume_files 테이블로 옮김
+
+사용법:
+    python -m backend.scripts.migrate_resume_files
+    python -m backend.scripts.migrate_resume_files --keep-columns   # 옛 컬럼은 지우지 않음
+
+- resume_files 테이블이 없으면 만든다
+- 사용자 한 명씩 BLOB 하나씩 읽어서 옮김 (전체를 메모리에 올리지 않음)
+- 이미 옮겨진 파일(같은 user_id, kind)은 건너뜀 → 중단 후 다시 실행해도 됨
+- 옮긴 뒤 users 의 BLOB 컬럼을 삭제해서 로그인/프로필 조회 행을 작게 만든다
+"""
+import argparse
+import time
+
+from sqlalchemy import inspect, text
+
+from backend.database import Base, SessionLocal, engine
+from backend.models import ResumeFile
+from backend.services.resume_files import resume_file_values
+
+LEGACY_COLUMNS = {"resume_pdf": "pdf", "resume_word": "word"}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--keep-columns", action="store_true", help="옮긴 뒤에도 users 의 BLOB 컬럼을 남김")
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine, tables=[ResumeFile.__table__])
+    columns = {c["name"] for c in inspect(engine).get_columns("users")}
+    legacy = [column for column in LEGACY_COLUMNS if column in columns]
+    if not legacy:
+        print("users 테이블에 옮길 이력서 컬럼이 없습니다.")
+        return
+
+    started = time.perf_counter()
+    moved = 0
+    moved_bytes = 0
+    with SessionLocal() as db:
+        for column in legacy:
+            kind = LEGACY_COLUMNS[column]
+            user_ids = db.execute(text(f"SELECT id FROM users WHERE {column} IS NOT NULL")).scalars().all()
+            done = set(db.execute(text("SELECT user_id FROM resume_files WHERE kind = :kind"), {"kind": kind}).scalars())
+            for user_id in user_ids:
+                if user_id in done:
+                    continue
+                data = db.execute(text(f"SELECT {column} FROM users WHERE id = :id"), {"id": user_id}).scalar()
+                filename = f"resume.{'pdf' if kind == 'pdf' else 'docx'}"
+                db.add(ResumeFile(user_id=user_id, kind=kind, **resume_file_values(kind, bytes(data), filename)))
+                db.commit()
+                db.expunge_all()
+                moved += 1
+                moved_bytes += len(data)
+
+        if not args.keep_columns:
+            for column in legacy:
+                db.execute(text(f"ALTER TABLE users DROP COLUMN {column}"))
+            db.commit()
+
+    print(
+        f"Moved {moved} files ({moved_bytes / 1024 / 1024:.1f}MB) to resume_files in "
+        f"{time.perf_counter() - started:.1f}s" + ("" if args.keep_columns else f", dropped {', '.join(legacy)}")
+    )
+
+
+if __name__ == "__main__":
+    main()
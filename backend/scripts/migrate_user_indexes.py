@@ -0,0 +1,47 @@
+"""
+users.name 에 UNIQUE 인덱스(uq_users_name)를 추가하고 auth_sessions 테이블을 만듦
+
+사용법:
+    python -m backend.scripts.migrate_user_indexes
+
+이름이 중복된 사용자가 있으면 목록을 출력하고 아무것도 바꾸지 않는다 (정리 후 다시 실행).
+이미 적용된 DB 에서 다시 실행해도 된다.
+"""
+import argparse
+
+from sqlalchemy import Index, inspect, text
+
+from backend.database import Base, engine
+from backend.models import AuthSession, User
+
+NAME_INDEX = "uq_users_name"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.parse_args()
+
+    inspector = inspect(engine)
+    existing = {c["name"] for c in inspector.get_unique_constraints("users")}
+    existing |= {i["name"] for i in inspector.get_indexes("users") if i.get("unique")}
+
+    if NAME_INDEX not in existing:
+        with engine.connect() as conn:
+            duplicates = conn.execute(
+                text("SELECT name, COUNT(*) FROM users GROUP BY name HAVING COUNT(*) > 1")
+            ).all()
+        if duplicates:
+            for name, count in duplicates:
+                print(f"중복 이름: {name} ({count}명)")
+            raise SystemExit("중복 이름을 정리한 뒤 다시 실행하세요.")
+        Index(NAME_INDEX, User.__table__.c.name, unique=True).create(bind=engine)
+        print(f"Created unique index {NAME_INDEX} on users.name")
+    else:
+        print(f"{NAME_INDEX} already exists")
+
+    Base.metadata.create_all(bind=engine, tables=[AuthSession.__table__])
+    print("auth_sessions table ready")
+
+
+if __name__ == "__main__":
+    main()
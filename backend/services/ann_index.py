@@ -0,0 +1,195 @@
+import json
+import os
+import time
+
+import numpy as np
+
+# 필터 후보가 이 개수 이하면 인덱스 종류와 관계없이 후보 벡터로 직접 거리 계산
+# (IVF/HNSW 의 selector 검색은 후보가 드물면 nprobe/efSearch 탐색 범위 안에 후보가 거의 없어 recall 이 떨어짐)
+EXACT_SEARCH_MAX_CANDIDATES = 4096
+# Flat 은 후보가 전체의 이 비율 이하일 때도 직접 계산
+# (그보다 크면 후보 벡터 복사가 전체 검색보다 비싸므로 faiss 검색 + 비트맵 selector)
+SUBSET_SEARCH_MAX_RATIO = 0.2
+
+
+def params_path(index_path):
+    """인덱스 파일 옆에 저장하는 검색 파라미터 경로 (index_hnsw.faiss -> index_hnsw.json)"""
+    return os.path.splitext(index_path)[0] + ".json"
+
+
+def read_index(index_path, mmap=True):
+    """
+    FAISS 인덱스 로드. mmap=True 면 파일을 메모리 매핑해서 여러 워커 프로세스가 페이지를 공유
+    (IVF 역리스트와 Flat/HNSW 저장 벡터 모두 매핑)
+    """
+    import faiss
+
+    if not mmap:
+        index = faiss.read_index(index_path)
+    else:
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        try:
+            # Flat/HNSW 저장 벡터 매핑 (지원하는 faiss 버전에서만)
+            index = faiss.read_index(index_path, flags | getattr(faiss, "IO_FLAG_MMAP_IFC", 0))
+        except RuntimeError:
+            # IVF 역리스트는 IO_FLAG_MMAP 만으로 매핑
+            index = faiss.read_index(index_path, flags)
+
+    params = {}
+    if os.path.exists(params_path(index_path)):
+        with open(params_path(index_path)) as f:
+            params = json.load(f)
+    set_search_params(index, params.get("nprobe"), params.get("ef_search"))
+    enable_reconstruct(index)
+    return index
+
+
+def enable_reconstruct(index):
+    """
+    IVF 인덱스에 id -> 위치 직접 맵을 만들어 reconstruct_batch 를 쓸 수 있게 함 (MMR/후보 직접 계산용)
+    인덱스를 바꾸는 작업이라 검색 스레드가 생기기 전, 로드할 때 한 번만 호출
+    """
+    import faiss
+
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return
+    if ivf.direct_map.type == faiss.DirectMap.NoMap:
+        ivf.make_direct_map()
+
+
+def set_search_params(index, nprobe=None, ef_search=None):
+    import faiss
+
+    if nprobe is not None:
+        try:
+            faiss.extract_index_ivf(index).nprobe = int(nprobe)
+        except RuntimeError:
+            pass
+    if ef_search is not None and hasattr(index, "hnsw"):
+        index.hnsw.efSearch = int(ef_search)
+
+
+def search_params(index, selector):
+    """
+    IDSelector 를 인덱스 종류에 맞는 SearchParameters 로 감쌈
+    (IVF 는 일반 SearchParameters 를 거부하고, HNSW 는 튜닝한 efSearch 를 넘겨야 그대로 적용됨)
+    """
+    import faiss
+
+    try:
+        ivf = faiss.extract_index_ivf(index)
+    except RuntimeError:
+        ivf = None
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    if hasattr(index, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def stored_vectors(index, positions):
+    """
+    위치 -> 인덱스에 저장된 벡터 (n, d). Flat 은 복사 없이 꺼낸 배열에서 슬라이스, IVF-PQ 는 양자화된 근사 벡터
+    IVF 는 enable_reconstruct 로 직접 맵을 만들어 둬야 함 (없거나 재구성을 지원하지 않으면 RuntimeError)
+    """
+    import faiss
+
+    if isinstance(index, faiss.IndexFlat):
+        flat = faiss.rev_swig_ptr(index.get_xb(), index.ntotal * index.d).reshape(index.ntotal, index.d)
+        return flat[positions]
+    return index.reconstruct_batch(positions)
+
+
+def filtered_search(index, queries, k, positions):
+    """
+    positions(위치 배열) 안에서만 검색. 반환은 index.search 와 같은 (거리, 위치), 결과가 k 개보다 적으면 열도 적음
+    후보가 적으면 후보 벡터로 직접 계산하고, 많으면 비트맵 IDSelector 로 faiss 검색
+    """
+    import faiss
+
+    vectors = None
+    if len(positions) <= EXACT_SEARCH_MAX_CANDIDATES or (
+        isinstance(index, faiss.IndexFlat) and len(positions) <= SUBSET_SEARCH_MAX_RATIO * index.ntotal
+    ):
+        try:
+            vectors = stored_vectors(index, positions)
+        except RuntimeError:
+            pass  # 재구성을 못 하는 인덱스는 selector 검색으로
+    if vectors is not None:
+        if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            scores = -(queries @ vectors.T)
+        else:
+            scores = (vectors ** 2).sum(axis=1)[None, :] - 2 * queries @ vectors.T + (queries ** 2).sum(axis=1)[:, None]
+        k = min(k, len(positions))
+        top = np.argpartition(scores, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(np.take_along_axis(scores, top, axis=1), axis=1), axis=1)
+        distances = np.take_along_axis(scores, top, axis=1)
+        if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            distances = -distances
+        return distances.astype(np.float32), positions[top]
+
+    allowed = np.zeros(index.ntotal, dtype=bool)
+    allowed[positions] = True
+    bitmap = np.packbits(allowed, bitorder="little")  # selector 가 참조하므로 검색이 끝날 때까지 유지
+    selector = faiss.IDSelectorBitmap(index.ntotal, faiss.swig_ptr(bitmap))
+    return index.search(queries, k, params=search_params(index, selector))
+
+
+def all_vectors(index):
+    """정확(Flat) 인덱스에 저장된 벡터 전체를 (ntotal, d) 배열로"""
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def build_index(vectors, kind="hnsw", metric=None, nlist=1024, pq_m=16, pq_bits=8, hnsw_m=32,
+                ef_construction=200):
+    """저장된 벡터로 IVF-PQ 또는 HNSW 인덱스 생성 (행 순서는 그대로 유지)"""
+    import faiss
+
+    metric = faiss.METRIC_L2 if metric is None else metric
+    d = vectors.shape[1]
+    if kind == "ivfpq":
+        nlist = min(nlist, max(1, len(vectors) // 39))  # 학습 데이터가 부족하면 리스트 수를 줄임
+        index = faiss.index_factory(d, f"IVF{nlist},PQ{pq_m}x{pq_bits}", metric)
+        index.train(vectors)
+    elif kind == "hnsw":
+        index = faiss.index_factory(d, f"HNSW{hnsw_m},Flat", metric)
+        index.hnsw.efConstruction = ef_construction
+    else:
+        raise ValueError(f"Unknown index kind: {kind}")
+    index.add(vectors)
+    return index
+
+
+def evaluate(exact_index, index, queries, k=5, filter_ratios=(0.1, 0.01), seed=0):
+    """
+    정확 인덱스 대비 recall@k 와 질의당 지연시간(ms) p50/p99
+    filter_ratios 비율의 행만 허용하는 필터 검색(근무지/마감일 필터 경로, filtered_search)의 recall 도 비율별로 측정
+    """
+    _, truth = exact_index.search(queries, k)
+
+    latencies = []
+    found = np.empty_like(truth)
+    for i in range(len(queries)):
+        started = time.perf_counter()
+        _, found[i : i + 1] = index.search(queries[i : i + 1], k)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    rng = np.random.default_rng(seed)
+    filtered_recall = {}
+    for ratio in filter_ratios:
+        allowed = np.sort(rng.choice(index.ntotal, size=max(k, int(index.ntotal * ratio)), replace=False))
+        _, filtered_truth = filtered_search(exact_index, queries, k, allowed)
+        _, filtered = filtered_search(index, queries, k, allowed)
+        filtered_hits = sum(len(set(t) & set(f) - {-1}) for t, f in zip(filtered_truth, filtered))
+        filtered_recall[ratio] = filtered_hits / filtered_truth.size
+
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    p50, p99 = np.percentile(latencies, [50, 99])
+    return {
+        "recall": hits / truth.size,
+        "filtered_recall": filtered_recall,
+        "p50_ms": float(p50),
+        "p99_ms": float(p99),
+    }
@@ -0,0 +1,78 @@
+import hashlib
+import os
+import secrets
+from datetime import datetime, timedelta
+
+from fastapi import Header, HTTPException
+from sqlalchemy import delete, select
+
+from ..database import AsyncSessionLocal
+from ..models import AuthSession, User
+from .caches import LRUCache
+
+# **세션 토큰 설정**
+AUTH_SESSION_TTL = float(os.getenv("AUTH_SESSION_TTL", str(7 * 24 * 3600)))
+# 인증된 사용자 캐시: 이 시간 동안은 토큰 확인에 DB 를 쓰지 않음
+# (다른 워커에서 로그아웃한 토큰도 최대 이 시간까지는 통과할 수 있음)
+AUTH_PRINCIPAL_CACHE_TTL = float(os.getenv("AUTH_PRINCIPAL_CACHE_TTL", "60"))
+AUTH_PRINCIPAL_CACHE_SIZE = int(os.getenv("AUTH_PRINCIPAL_CACHE_SIZE", "10000"))
+
+principal_cache = LRUCache(maxsize=AUTH_PRINCIPAL_CACHE_SIZE, ttl=AUTH_PRINCIPAL_CACHE_TTL)
+
+
+def token_hash(token):
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+async def issue_token(db, user_id, name):
+    """새 세션 토큰 발급. 원문은 응답으로만 돌려주고 DB 에는 해시만 저장"""
+    token = secrets.token_urlsafe(32)
+    now = datetime.utcnow()
+    db.add(
+        AuthSession(
+            token_hash=token_hash(token),
+            user_id=user_id,
+            created_at=now,
+            expires_at=now + timedelta(seconds=AUTH_SESSION_TTL),
+        )
+    )
+    await db.commit()
+    principal_cache.set(token_hash(token), {"id": user_id, "name": name})
+    return token
+
+
+async def revoke_token(db, token):
+    hashed = token_hash(token)
+    principal_cache.pop(hashed)
+    await db.execute(delete(AuthSession).where(AuthSession.token_hash == hashed))
+    await db.commit()
+
+
+def bearer_token(authorization):
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Missing bearer token")
+    return token.strip()
+
+
+async def current_user(authorization: str = Header(None)):
+    """
+    Authorization: Bearer <token> 의 사용자 {"id", "name"}
+    캐시에 있으면 DB 세션을 열지 않음 (캐시 미스일 때만 커넥션 사용)
+    """
+    hashed = token_hash(bearer_token(authorization))
+    principal = principal_cache.get(hashed)
+    if principal is None:
+        async with AsyncSessionLocal() as db:
+            row = (
+                await db.execute(
+                    select(User.id, User.name)
+                    .join(AuthSession, AuthSession.user_id == User.id)
+                    .where(AuthSession.token_hash == hashed, AuthSession.expires_at > datetime.utcnow())
+                )
+            ).first()
+        if row is None:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+        principal = {"id": row.id, "name": row.name}
+        principal_cache.set(hashed, principal)
+    return principal
@@ -0,0 +1,61 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorSaturated(Exception):
+    """대기열이 가득 찼거나 queue_timeout 안에 실행 슬롯을 얻지 못함 (HTTP 429 로 변환)"""
+
+
+class BoundedExecutor:
+    """
+    블로킹 작업(모델 forward, FAISS 검색 등)을 전용 스레드 풀에서 실행
+
+    - 동시에 실행되는 작업은 max_workers 개
+    - 슬롯을 기다리는 요청은 최대 max_queue 개, 각각 queue_timeout 초까지만 대기
+    """
+
+    def __init__(self, name, max_workers=2, max_queue=32, queue_timeout=2.0):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._slots = asyncio.Semaphore(max_workers)
+        self._waiting = 0
+        self._running = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn, *args, **kwargs):
+        if self._waiting >= self.max_queue:
+            self.rejected += 1
+            raise ExecutorSaturated(f"{self.name}: queue is full ({self.max_queue})")
+
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise ExecutorSaturated(f"{self.name}: no worker available within {self.queue_timeout}s")
+        finally:
+            self._waiting -= 1
+
+        self._running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(fn, *args, **kwargs))
+        finally:
+            self._running -= 1
+            self.completed += 1
+            self._slots.release()
+
+    def stats(self):
+        return {
+            "max_workers": self.max_workers,
+            "running": self._running,
+            "waiting": self._waiting,
+            "max_queue": self.max_queue,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
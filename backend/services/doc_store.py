@@ -0,0 +1,254 @@
+import json
+import os
+
+import numpy as np
+
+MANIFEST = "manifest.json"
+CONTENT = "page_content"
+DOC_ID = "doc_id"
+
+
+def _column_files(path, column):
+    """(바이트 파일, 오프셋 배열, 행별 값 존재 비트맵) 경로"""
+    return (
+        os.path.join(path, f"{column}.bin"),
+        os.path.join(path, f"{column}.idx.npy"),
+        os.path.join(path, f"{column}.valid.npy"),
+    )
+
+
+def field_value(get_metadata, get_content, keys):
+    """
+    metadata 에서 keys 중 처음 값이 있는 것, 없으면 본문의 '키: 값' 줄에서 찾음
+    get_content 는 본문이 필요할 때만 호출
+    """
+    for key in keys:
+        value = get_metadata(key)
+        if value:
+            return str(value).strip()
+    for line in (get_content() or "").splitlines():
+        name, sep, value = line.partition(":")
+        if sep and name.strip() in keys:
+            return value.strip()
+    return ""
+
+
+def _make_document(page_content, metadata):
+    from langchain_core.documents import Document
+
+    return Document(page_content=page_content, metadata=metadata)
+
+
+class _ColumnWriter:
+    def __init__(self, path, column, start_row):
+        self.column = column
+        self.data_path, self.index_path, self.valid_path = _column_files(path, column)
+        self.file = open(self.data_path, "wb")
+        self.offsets = [0] * (start_row + 1)
+        # 길이 0 인 값(빈 본문 등)과 값이 없는 행을 구분하기 위해 존재 여부를 따로 기록
+        self.valid = [False] * start_row
+
+    def append(self, value):
+        if value is not None:
+            self.file.write(value)
+        self.offsets.append(self.file.tell())
+        self.valid.append(value is not None)
+
+    def close(self):
+        self.file.close()
+        np.save(self.index_path, np.array(self.offsets, dtype=np.int64))
+        np.save(self.valid_path, np.packbits(np.array(self.valid, dtype=bool), bitorder="little"))
+
+
+def write_doc_store(path, rows, size):
+    """
+    rows: (FAISS 행 번호, docstore id, Document) 를 행 번호 순서로
+    page_content / doc_id / metadata 키마다 한 컬럼씩 (바이트 파일 + 오프셋 배열) 로 저장
+    metadata 값은 JSON 으로 인코딩해서 타입을 보존
+    """
+    os.makedirs(path, exist_ok=True)
+    writers = {}
+    next_row = 0
+
+    def write_row(values):
+        for column, writer in writers.items():
+            writer.append(values.get(column))
+
+    for row, doc_id, doc in rows:
+        while next_row < row:  # 비어 있는 행
+            write_row({})
+            next_row += 1
+        values = {CONTENT: doc.page_content.encode("utf-8"), DOC_ID: str(doc_id).encode("utf-8")}
+        for key, value in doc.metadata.items():
+            values[f"meta.{key}"] = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        for column in values:
+            if column not in writers:
+                writers[column] = _ColumnWriter(path, column, next_row)
+        write_row(values)
+        next_row += 1
+    while next_row < size:
+        write_row({})
+        next_row += 1
+
+    for writer in writers.values():
+        writer.close()
+    with open(os.path.join(path, MANIFEST), "w") as f:
+        json.dump({"size": size, "columns": sorted(writers)}, f, ensure_ascii=False)
+
+
+class MmapDocStore:
+    """
+    컬럼별로 메모리 매핑한 문서 저장소
+
+    행 번호(FAISS id)로 필요한 문서만 그때그때 Document 로 만든다.
+    """
+
+    def __init__(self, path):
+        with open(os.path.join(path, MANIFEST)) as f:
+            manifest = json.load(f)
+        self.path = path
+        self.size = manifest["size"]
+        self.columns = {}
+        for column in manifest["columns"]:
+            data_path, index_path, valid_path = _column_files(path, column)
+            offsets = np.load(index_path, mmap_mode="r")
+            data = np.memmap(data_path, dtype=np.uint8, mode="r") if os.path.getsize(data_path) else b""
+            # 비트맵이 없는 예전 저장소는 길이 0 인 값을 없는 값으로 봄
+            valid = np.load(valid_path, mmap_mode="r") if os.path.exists(valid_path) else None
+            self.columns[column] = (data, offsets, valid)
+        self.metadata_keys = [c[len("meta."):] for c in self.columns if c.startswith("meta.")]
+
+    def __len__(self):
+        return self.size
+
+    def _raw(self, column, row):
+        data, offsets, valid = self.columns[column]
+        if row >= len(offsets) - 1:
+            return None
+        start, end = offsets[row], offsets[row + 1]
+        present = end > start if valid is None else valid[row >> 3] >> (row & 7) & 1
+        return bytes(data[start:end]) if present else None
+
+    def _present(self, column):
+        """컬럼 하나의 행별 값 존재 여부 (bool 배열)"""
+        _, offsets, valid = self.columns[column]
+        if valid is None:
+            return np.diff(np.asarray(offsets)) > 0
+        return np.unpackbits(np.asarray(valid), count=len(offsets) - 1, bitorder="little").astype(bool)
+
+    def value(self, column, row):
+        raw = self._raw(column, row)
+        return None if raw is None else raw.decode("utf-8")
+
+    def metadata_value(self, key, row):
+        """metadata 한 항목만 (컬럼 value("meta.<key>", row) 를 JSON 디코딩). 없으면 None"""
+        column = f"meta.{key}"
+        if column not in self.columns:
+            return None
+        raw = self._raw(column, row)
+        return None if raw is None else json.loads(raw)
+
+    def _column_values(self, column):
+        """metadata 컬럼 하나 전체 -> 행별 값 목록 (값이 없는 행은 None). 컬럼 파일만 읽고 JSON 은 한 번에 디코딩"""
+        data, offsets, _ = self.columns[column]
+        buffer = bytes(data)
+        present = self._present(column)[: self.size].tolist()
+        offsets = np.asarray(offsets)[: self.size + 1].tolist()
+        values = [buffer[start:end] if ok else b"null" for start, end, ok in zip(offsets, offsets[1:], present)]
+        values = json.loads(b"[" + b",".join(values) + b"]")
+        return values + [None] * (self.size - len(values))
+
+    def field_rows(self, fields):
+        """
+        fields: {이름: metadata 키 후보} -> (행 번호, {이름: 값}) 를 행 순서대로
+        Document 를 만들지 않고 필요한 metadata 컬럼만 읽음 (본문은 metadata 에 값이 없는 행만 디코딩)
+        """
+        columns = {}
+        for keys in fields.values():
+            for key in keys:
+                column = f"meta.{key}"
+                if column in self.columns and key not in columns:
+                    columns[key] = self._column_values(column)
+
+        present = np.nonzero(self._present(CONTENT))[0]
+        for row in present[present < self.size].tolist():
+            content = []
+
+            def get_content():
+                if not content:
+                    content.append(self.value(CONTENT, row))
+                return content[0]
+
+            yield row, {
+                name: field_value(lambda key: columns[key][row] if key in columns else None, get_content, keys)
+                for name, keys in fields.items()
+            }
+
+    def document(self, row):
+        row = int(row)
+        if row < 0 or row >= self.size:
+            return None
+        content = self.value(CONTENT, row)
+        if content is None:
+            return None
+        metadata = {}
+        for key in self.metadata_keys:
+            raw = self._raw(f"meta.{key}", row)
+            if raw is not None:
+                metadata[key] = json.loads(raw)
+        return _make_document(content, metadata)
+
+    def rows(self):
+        for row in range(self.size):
+            doc = self.document(row)
+            if doc is not None:
+                yield row, doc
+
+
+class PickleDocStore:
+    """기존 LangChain index.pkl (docstore, index_to_docstore_id) 을 같은 인터페이스로 감쌈"""
+
+    def __init__(self, docstore, index_to_docstore_id):
+        self.docstore = docstore
+        self.index_to_docstore_id = index_to_docstore_id
+
+    @classmethod
+    def load(cls, metadata_path):
+        import pickle
+
+        with open(metadata_path, "rb") as f:
+            return cls(*pickle.load(f))
+
+    def __len__(self):
+        return len(self.index_to_docstore_id)
+
+    @property
+    def size(self):
+        """행 번호 범위 (마지막 행 번호 + 1)"""
+        return max(self.index_to_docstore_id, default=-1) + 1
+
+    def document(self, row):
+        doc_id = self.index_to_docstore_id.get(int(row))
+        if doc_id is None:
+            return None
+        doc = self.docstore.search(doc_id)
+        return None if isinstance(doc, str) else doc
+
+    def rows(self):
+        for row in sorted(self.index_to_docstore_id):
+            doc = self.document(row)
+            if doc is not None:
+                yield row, doc
+
+    def field_rows(self, fields):
+        for row, doc in self.rows():
+            yield row, {
+                name: field_value(doc.metadata.get, lambda: doc.page_content, keys) for name, keys in fields.items()
+            }
+
+    def export_rows(self):
+        """write_doc_store 입력 형식 (행 번호, docstore id, Document)"""
+        for row in sorted(self.index_to_docstore_id):
+            doc = self.document(row)
+            if doc is not None:
+                yield row, self.index_to_docstore_id[row], doc
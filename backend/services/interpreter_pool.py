@@ -0,0 +1,169 @@
+import asyncio
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+import numpy as np
+
+
+def load_interpreter(model_path, num_threads=1):
+    import tensorflow as tf
+
+    interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=num_threads)
+    interpreter.allocate_tensors()
+    return interpreter
+
+
+# 모델 입력 텐서의 dtype 과 양자화 파라미터 (float 모델은 scale=0.0)
+InputSpec = namedtuple("InputSpec", ["dtype", "scale", "zero_point"])
+FLOAT_INPUT = InputSpec(np.float32, 0.0, 0)
+
+
+def get_input_spec(interpreter):
+    input_detail = interpreter.get_input_details()[0]
+    scale, zero_point = input_detail["quantization"]
+    return InputSpec(np.dtype(input_detail["dtype"]).type, scale, zero_point)
+
+
+def invoke_interpreter(interpreter, batch):
+    """배치 크기가 바뀌면 입력 텐서를 다시 잡고 한 번 invoke. 양자화 출력은 float 로 복원"""
+    input_detail = interpreter.get_input_details()[0]
+    if tuple(input_detail["shape"]) != batch.shape:
+        interpreter.resize_tensor_input(input_detail["index"], list(batch.shape))
+        interpreter.allocate_tensors()
+    interpreter.set_tensor(input_detail["index"], batch)
+    interpreter.invoke()
+
+    output_detail = interpreter.get_output_details()[0]
+    output = np.array(interpreter.get_tensor(output_detail["index"]))
+    scale, zero_point = output_detail["quantization"]
+    if scale:
+        output = (output.astype(np.float32) - zero_point) * scale
+    return output
+
+
+# 프로세스 워커마다 하나씩 들고 있는 인터프리터
+_process_interpreter = None
+
+
+def _process_init(model_path, num_threads):
+    global _process_interpreter
+    _process_interpreter = load_interpreter(model_path, num_threads)
+
+
+def _process_invoke(batch):
+    return invoke_interpreter(_process_interpreter, batch)
+
+
+class InterpreterWorker:
+    """풀 안의 인터프리터 하나 (스레드 또는 프로세스 1개 전용)"""
+
+    def __init__(self, index, executor, interpreter=None):
+        self.index = index
+        self.executor = executor
+        self.interpreter = interpreter
+        self.calls = 0
+        self.busy_seconds = 0.0
+        self.created_at = time.monotonic()
+
+    async def run(self, batch):
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        try:
+            if self.interpreter is not None:
+                return await loop.run_in_executor(
+                    self.executor, invoke_interpreter, self.interpreter, batch
+                )
+            return await loop.run_in_executor(self.executor, _process_invoke, batch)
+        finally:
+            self.calls += 1
+            self.busy_seconds += time.perf_counter() - started
+
+    def stats(self):
+        uptime = time.monotonic() - self.created_at
+        return {
+            "index": self.index,
+            "calls": self.calls,
+            "busy_seconds": round(self.busy_seconds, 3),
+            "utilisation": round(self.busy_seconds / uptime, 4) if uptime > 0 else 0.0,
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+
+
+class InterpreterPool:
+    """
+    TFLite 인터프리터 풀
+
+    - backend="thread": 인터프리터 N개를 각각 전용 스레드에서 실행 (num_threads 로 op 병렬도 조절)
+    - backend="process": 인터프리터를 가진 프로세스 N개
+    인터프리터는 스레드 안전하지 않으므로 한 번에 한 요청만 checkout 할 수 있다.
+    """
+
+    def __init__(self, model_path, size=None, num_threads=1, backend="thread"):
+        if backend not in ("thread", "process"):
+            raise ValueError(f"Unknown interpreter pool backend: {backend}")
+        self.model_path = model_path
+        self.size = size or os.cpu_count() or 1
+        self.num_threads = num_threads
+        self.backend = backend
+        self.workers = []
+        self._idle = asyncio.Queue()
+        self._waiting = 0
+
+        # 입력 dtype/양자화 파라미터 확인용으로 먼저 하나 로드 (thread 백엔드는 0번 워커로 재사용)
+        probe = load_interpreter(model_path, num_threads)
+        self.input_spec = get_input_spec(probe)
+
+        for i in range(self.size):
+            if backend == "thread":
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"tflite-{i}")
+                interpreter = probe if i == 0 else load_interpreter(model_path, num_threads)
+                worker = InterpreterWorker(i, executor, interpreter)
+            else:
+                executor = ProcessPoolExecutor(
+                    max_workers=1, initializer=_process_init, initargs=(model_path, num_threads)
+                )
+                worker = InterpreterWorker(i, executor)
+            self.workers.append(worker)
+            self._idle.put_nowait(worker)
+
+    async def acquire(self):
+        self._waiting += 1
+        try:
+            return await self._idle.get()
+        finally:
+            self._waiting -= 1
+
+    def release(self, worker):
+        self._idle.put_nowait(worker)
+
+    @asynccontextmanager
+    async def checkout(self):
+        worker = await self.acquire()
+        try:
+            yield worker
+        finally:
+            self.release(worker)
+
+    async def run(self, batch):
+        async with self.checkout() as worker:
+            return await worker.run(batch)
+
+    def stats(self):
+        return {
+            "backend": self.backend,
+            "size": self.size,
+            "num_threads": self.num_threads,
+            "input_dtype": np.dtype(self.input_spec.dtype).name,
+            "idle": self._idle.qsize(),
+            "queue_depth": self._waiting,
+            "workers": [w.stats() for w in self.workers],
+        }
+
+    def close(self):
+        for worker in self.workers:
+            worker.close()
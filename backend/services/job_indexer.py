@@ -0,0 +1,120 @@
+import json
+import os
+import sqlite3
+
+import numpy as np
+
+from .job_search import JOB_ID_KEYS, metadata_value, parse_date
+
+# datasets/job_ingest.py 의 job_postings 컬럼 -> 문서 본문 항목
+CONTENT_FIELDS = [
+    ("recrtTitle", "채용제목"),
+    ("oranNm", "기업명"),
+    ("workPlcNm", "근무지명"),
+    ("emplymShpNm", "고용형태"),
+    ("acptMthd", "접수방법"),
+    ("frDd", "접수 시작일"),
+    ("toDd", "접수 종료일"),
+    ("jobclsNm", "직종명"),
+]
+METADATA_FIELDS = ["jobId", "workPlcNm", "toDd", "jobclsNm", "deadline"]
+# 공고 상세 페이지 URL 형식 ({jobId} 자리에 공고 ID). 수집 API 에 URL 이 없어서 jobId 로 만든다
+# 지정하지 않으면 기본 인덱스 문서의 url 에서 추론
+JOB_URL_TEMPLATE = os.getenv("JOB_URL_TEMPLATE", "")
+
+
+def url_template(job_index, sample=1000):
+    """기본 인덱스에서 url 에 jobId 가 들어 있는 문서를 찾아 '...{jobId}...' 형식으로 (못 찾으면 None)"""
+    if JOB_URL_TEMPLATE:
+        return JOB_URL_TEMPLATE
+    for row in range(min(sample, job_index.base_size)):
+        doc = job_index.document(row)
+        if doc is None:
+            continue
+        job_id = metadata_value(doc, JOB_ID_KEYS)
+        url = doc.metadata.get("url")
+        if job_id and url and job_id in url:
+            return url.replace(job_id, "{jobId}", 1)
+    return None
+
+
+def posting_document(posting, url_format=None):
+    """수집한 공고 한 건 -> 기존 인덱스와 같은 형식의 Document ('채용제목: ...' 로 시작)"""
+    from langchain_core.documents import Document
+
+    lines = [f"{label}: {posting[field]}" for field, label in CONTENT_FIELDS if posting.get(field)]
+    metadata = {field: posting.get(field) for field in METADATA_FIELDS}
+    metadata["url"] = url_format.replace("{jobId}", str(posting["jobId"])) if url_format else None
+    return Document(page_content="\n".join(lines), metadata=metadata)
+
+
+def is_expired(posting, today):
+    return "마감" in (posting.get("deadline") or "") or parse_date(posting.get("toDd") or "") < today
+
+
+def read_watermark(path):
+    """기본 인덱스를 만들 때 반영한 마지막 수집 실행 번호 (파일이 없으면 None)"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f).get("ingest_run")
+
+
+def pending_postings(db_path, after_run):
+    """after_run 이후 새로 들어왔거나 바뀐 공고와 최신 수집 실행 번호"""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        latest = conn.execute("SELECT MAX(run_id) FROM ingest_runs WHERE finished_at IS NOT NULL").fetchone()[0]
+        if latest is None:
+            return [], after_run
+        rows = conn.execute(
+            "SELECT * FROM job_postings WHERE updated_run > ? AND updated_run <= ? ORDER BY updated_run",
+            (after_run or 0, latest),
+        ).fetchall()
+        return [dict(row) for row in rows], latest
+    finally:
+        conn.close()
+
+
+def sync_index(job_index, db_path, today, batch_size=32):
+    """
+    수집 DB 의 변경분을 반영한 새 JobIndex 와 요약을 반환 (변경이 없으면 (None, 요약))
+
+    - 새 공고 / 내용이 바뀐 공고: batch_size 개씩 묶어 임베딩 후 delta 에 추가
+      (바뀐 공고의 옛 행은 삭제 처리해서 jobId 당 살아 있는 행은 하나)
+    - 마감 공고 (deadline 플래그 / toDd 경과): 삭제 처리
+    - 처음 동기화할 때 워터마크가 없으면 이미 인덱스에 있는 jobId 는 그대로 둠
+    """
+    today = parse_date(today)
+    postings, latest = pending_postings(db_path, job_index.ingest_run)
+    first_sync = job_index.ingest_run is None
+
+    to_add = []
+    remove_rows = set()
+    for posting in postings:
+        row = job_index.row_for_job(posting["jobId"])
+        if first_sync and row is not None:
+            continue
+        if row is not None:
+            remove_rows.add(row)
+        if not is_expired(posting, today):
+            to_add.append(posting)
+    remove_rows.update(int(row) for row in job_index.metadata.expired_rows(str(today)))
+
+    summary = {"ingest_run": latest, "added": len(to_add), "removed": len(remove_rows)}
+    if not to_add and not remove_rows:
+        if latest == job_index.ingest_run:
+            return None, summary
+        return job_index.with_updates([], [], ingest_run=latest), summary
+
+    url_format = url_template(job_index)
+    if url_format is None:
+        print("[index-sync] 공고 URL 형식을 알 수 없어 url 없이 추가합니다 (JOB_URL_TEMPLATE 을 지정하세요)")
+    docs = [posting_document(posting, url_format) for posting in to_add]
+    vectors = []
+    for start in range(0, len(docs), batch_size):
+        batch = docs[start : start + batch_size]
+        vectors.extend(job_index.embeddings.embed_documents([doc.page_content for doc in batch]))
+    vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, job_index.index.d)
+    return job_index.with_updates(docs, vectors, remove_rows, ingest_run=latest), summary
@@ -0,0 +1,332 @@
+import re
+from collections import defaultdict
+
+import numpy as np
+
+from .ann_index import filtered_search, search_params, stored_vectors
+from .doc_store import field_value
+
+# 메타데이터 키 후보 (인덱스를 만든 시점에 따라 API 원본 키 또는 한글 컬럼명이 들어 있음)
+AREA_KEYS = ("workPlcNm", "근무지명", "근무지")
+DEADLINE_DATE_KEYS = ("toDd", "접수 종료일", "접수종료일")
+DEADLINE_FLAG_KEYS = ("deadline", "마감여부")
+JOB_CLASS_KEYS = ("jobclsNm", "직종명")
+JOB_ID_KEYS = ("jobId", "채용공고ID")
+# 역색인에 쓰는 항목 -> 키 후보
+INDEX_FIELDS = {
+    "area": AREA_KEYS,
+    "deadline_date": DEADLINE_DATE_KEYS,
+    "deadline_flag": DEADLINE_FLAG_KEYS,
+    "job_class": JOB_CLASS_KEYS,
+    "job_id": JOB_ID_KEYS,
+}
+
+# 시/도 이름을 짧은 형태로 통일 ("서울특별시" -> "서울", "경상남도" -> "경남")
+SIDO_ALIASES = {
+    "충청북도": "충북", "충청남도": "충남",
+    "전라북도": "전북", "전북특별자치도": "전북", "전라남도": "전남",
+    "경상북도": "경북", "경상남도": "경남",
+    "강원도": "강원", "강원특별자치도": "강원",
+    "제주도": "제주", "제주특별자치도": "제주",
+    "세종특별자치시": "세종",
+}
+SIDO_SUFFIX = re.compile(r"(특별자치시|특별자치도|특별시|광역시|도)$")
+OPEN_ENDED = 99999999  # 마감일이 없는 공고
+
+
+def normalize_sido(token):
+    if token in SIDO_ALIASES:
+        return SIDO_ALIASES[token]
+    return SIDO_SUFFIX.sub("", token) or token
+
+
+def area_keys(area):
+    """'서울특별시 강남구 ...' -> ['서울', '서울 강남구']"""
+    tokens = area.split()
+    if not tokens:
+        return []
+    sido = normalize_sido(tokens[0])
+    keys = [sido]
+    if len(tokens) > 1:
+        keys.append(f"{sido} {tokens[1]}")
+    return keys
+
+
+def metadata_value(doc, keys):
+    """metadata 에서 먼저 찾고, 없으면 본문의 '키: 값' 줄에서 찾음"""
+    return field_value(doc.metadata.get, lambda: doc.page_content, keys)
+
+
+def parse_date(value):
+    digits = re.sub(r"\D", "", value)
+    return int(digits[:8]) if len(digits) >= 8 else OPEN_ENDED
+
+
+class MetadataIndex:
+    """
+    문서 메타데이터(근무지, 마감일, 직종) 역색인
+
+    FAISS 행 번호 기준으로 지역/직종별 행 목록과 행별 마감일 배열을 들고 있다가
+    검색 전에 조건에 맞는 행 번호 집합을 만든다.
+    removed 는 삭제(만료/변경으로 대체)된 행으로, 어떤 검색에도 나오지 않는다.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.by_area = defaultdict(list)
+        self.by_job_class = defaultdict(list)
+        self.by_job_id = {}
+        self.deadline = np.full(size, OPEN_ENDED, dtype=np.int64)
+        self.closed = np.zeros(size, dtype=bool)
+        self.removed = np.zeros(size, dtype=bool)
+
+    @classmethod
+    def build(cls, rows, size):
+        """
+        rows: (FAISS 행 번호, {INDEX_FIELDS 이름: 값}) 를 하나씩 내주는 iterator (docs.field_rows(INDEX_FIELDS))
+        문서 저장소가 필요한 항목만 읽어서 주므로 Document 를 만들지 않음
+        """
+        index = cls(size)
+        for row, values in rows:
+            index.add_values(row, values)
+        index.freeze()
+        return index
+
+    def add(self, row, doc):
+        self.add_values(row, {name: metadata_value(doc, keys) for name, keys in INDEX_FIELDS.items()})
+
+    def add_values(self, row, values):
+        for key in area_keys(values["area"]):
+            self.by_area[key].append(row)
+        if values["job_class"]:
+            self.by_job_class[values["job_class"]].append(row)
+        if values["job_id"]:
+            self.by_job_id[values["job_id"]] = row
+        self.deadline[row] = parse_date(values["deadline_date"])
+        self.closed[row] = "마감" in values["deadline_flag"]
+
+    def freeze(self):
+        self.by_area = {k: np.array(sorted(v), dtype=np.int64) for k, v in self.by_area.items()}
+        self.by_job_class = {k: np.array(sorted(v), dtype=np.int64) for k, v in self.by_job_class.items()}
+
+    def updated(self, rows, remove_rows):
+        """
+        새 행 추가 + 행 삭제를 반영한 사본 (copy-on-write, 기존 인덱스는 그대로 두어 진행 중인 검색에 영향 없음)
+        rows: 기존 size 부터 이어지는 (행 번호, Document)
+        """
+        rows = list(rows)
+        size = self.size + len(rows)
+        copy = MetadataIndex(size)
+        copy.by_job_id = dict(self.by_job_id)
+        copy.deadline[: self.size] = self.deadline
+        copy.closed[: self.size] = self.closed
+        copy.removed[: self.size] = self.removed
+        copy.removed[np.asarray(list(remove_rows), dtype=np.int64)] = True
+
+        for row, doc in rows:
+            copy.add(row, doc)
+        # 새 행은 기존 행보다 번호가 크므로 뒤에 이어 붙이면 정렬 유지
+        for name in ("by_area", "by_job_class"):
+            old, new = getattr(self, name), getattr(copy, name)
+            merged = dict(old)
+            for key, added in new.items():
+                added = np.array(added, dtype=np.int64)
+                merged[key] = np.concatenate([old[key], added]) if key in old else added
+            setattr(copy, name, merged)
+        return copy
+
+    def expired_rows(self, date):
+        """date 기준으로 마감됐지만 아직 삭제되지 않은 행"""
+        return np.nonzero(((self.deadline < parse_date(date)) | self.closed) & ~self.removed)[0]
+
+    def candidate_ids(self, area="", date="", job_class=""):
+        """조건에 맞는 행 번호 배열. 조건이 하나도 없으면 None (전체 검색)"""
+        ids = None
+        keys = area_keys(area)
+        if keys:
+            ids = self.by_area.get(keys[-1], np.empty(0, dtype=np.int64))
+        if job_class:
+            rows = self.by_job_class.get(job_class.strip(), np.empty(0, dtype=np.int64))
+            ids = rows if ids is None else np.intersect1d(ids, rows, assume_unique=True)
+        if date:
+            open_rows = np.nonzero((self.deadline >= parse_date(date)) & ~self.closed)[0]
+            ids = open_rows if ids is None else np.intersect1d(ids, open_rows, assume_unique=True)
+        if ids is not None and self.removed.any():
+            ids = ids[~self.removed[ids]]
+        return ids
+
+    def stats(self):
+        return {
+            "documents": self.size,
+            "areas": len(self.by_area),
+            "job_classes": len(self.by_job_class),
+            "closed": int(self.closed.sum()),
+            "removed": int(self.removed.sum()),
+        }
+
+
+class JobIndex:
+    """
+    FAISS 인덱스 + 문서 저장소 + 메타데이터 역색인 + 행렬 검색
+
+    디스크의 기본 인덱스(base, 읽기 전용/메모리 매핑)는 그대로 두고,
+    수집 피드에서 들어온 새 공고는 메모리의 작은 delta 인덱스에 행 번호 base.ntotal 부터 붙인다.
+    만료되거나 내용이 바뀐 공고의 옛 행은 removed 로 표시해서 검색에서 뺀다.
+    with_updates() 는 새 JobIndex 를 만들어 반환하므로 교체(hot-swap) 전까지 기존 검색은 영향이 없다.
+    """
+
+    def __init__(self, index, embeddings, docs, normalize_L2=False, ingest_run=None):
+        self.index = index
+        self.embeddings = embeddings
+        self.docs = docs  # MmapDocStore 또는 PickleDocStore (행 번호 -> Document)
+        self.normalize_L2 = normalize_L2
+        self.base_size = index.ntotal
+        self.delta = None
+        self.delta_vectors = np.empty((0, index.d), dtype=np.float32)
+        self.delta_docs = {}
+        self.ingest_run = ingest_run  # 반영한 마지막 수집 실행 번호
+        self.metadata = MetadataIndex.build(docs.field_rows(INDEX_FIELDS), max(docs.size, self.base_size))
+
+    @property
+    def ntotal(self):
+        return self.base_size + len(self.delta_vectors)
+
+    def document(self, row):
+        row = int(row)
+        if row >= self.base_size:
+            return self.delta_docs.get(row)
+        return self.docs.document(row)
+
+    def _prepare(self, vectors):
+        import faiss
+
+        queries = np.ascontiguousarray(vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+        if self.normalize_L2:
+            faiss.normalize_L2(queries)
+        return queries
+
+    def _search_part(self, index, queries, k, offset, ids=None, exclude=None):
+        """
+        인덱스 하나(base 또는 delta)에서 검색. 반환 (거리, 행 번호), 거리는 작을수록 가까움
+        ids: 이 안에서만 검색 / exclude: 이 행들은 제외
+        """
+        import faiss
+
+        n = len(queries)
+        empty = (np.full((n, 0), np.inf, dtype=np.float32), np.full((n, 0), -1, dtype=np.int64))
+        if index is None or index.ntotal == 0:
+            return empty
+
+        if ids is not None:
+            positions = ids[(ids >= offset) & (ids < offset + index.ntotal)] - offset
+            if len(positions) == 0:
+                return empty
+            distances, indices = filtered_search(index, queries, k, positions)
+        else:
+            selector = None
+            if exclude is not None:
+                positions = exclude[(exclude >= offset) & (exclude < offset + index.ntotal)] - offset
+                if len(positions):
+                    excluded = faiss.IDSelectorBatch(positions)  # IDSelectorNot 이 참조하므로 검색이 끝날 때까지 유지
+                    selector = faiss.IDSelectorNot(excluded)
+            params = None if selector is None else search_params(index, selector)
+            distances, indices = index.search(queries, k, params=params)
+        if index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            distances = -distances
+        distances = np.where(indices >= 0, distances, np.inf)
+        return distances, np.where(indices >= 0, indices + offset, -1)
+
+    def search_ids(self, vectors, k=5, ids=None):
+        """질의 벡터 행렬 -> 질의별 상위 k 개 행 번호. ids 를 주면 그 행들 안에서만 검색"""
+        queries = self._prepare(vectors)
+        if ids is not None and len(ids) == 0:
+            return np.full((len(queries), 0), -1, dtype=np.int64)
+
+        exclude = None
+        if ids is None and self.metadata.removed.any():
+            exclude = np.nonzero(self.metadata.removed)[0]
+        parts = [
+            self._search_part(self.index, queries, k, 0, ids=ids, exclude=exclude),
+            self._search_part(self.delta, queries, k, self.base_size, ids=ids, exclude=exclude),
+        ]
+        distances = np.concatenate([d for d, _ in parts], axis=1)
+        rows = np.concatenate([r for _, r in parts], axis=1)
+        order = np.argsort(distances, axis=1, kind="stable")[:, :k]
+        return np.take_along_axis(rows, order, axis=1)
+
+    def search(self, vectors, k=5, ids=None):
+        """질의별 Document 목록"""
+        results = []
+        for row in self.search_ids(vectors, k=k, ids=ids):
+            docs = [self.document(i) for i in row if i != -1]
+            results.append([doc for doc in docs if doc is not None])
+        return results
+
+    def _base_vectors(self, positions):
+        """
+        기본 인덱스에 저장된 벡터 (읽기 전용, 여러 검색 스레드에서 동시에 호출)
+        IVF 는 로드할 때 ann_index.enable_reconstruct 로 직접 맵을 만들어 둬야 함 (없으면 RuntimeError)
+        """
+        return stored_vectors(self.index, positions)
+
+    def vectors(self, rows):
+        """
+        행 번호 -> 인덱스에 저장된 벡터 (n, d). MMR 재순위용
+        재구성을 지원하지 않는 인덱스면 None
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        out = np.empty((len(rows), self.index.d), dtype=np.float32)
+        base = rows < self.base_size
+        if base.any():
+            try:
+                out[base] = self._base_vectors(rows[base])
+            except RuntimeError:
+                return None
+        if not base.all():
+            out[~base] = self.delta_vectors[rows[~base] - self.base_size]
+        return out
+
+    def row_for_job(self, job_id):
+        row = self.metadata.by_job_id.get(job_id)
+        if row is None or self.metadata.removed[row]:
+            return None
+        return row
+
+    def with_updates(self, docs, vectors, remove_rows=(), ingest_run=None):
+        """
+        새 문서/벡터를 delta 에 붙이고 remove_rows 를 삭제 처리한 새 JobIndex (기존 객체는 변경하지 않음)
+        """
+        import faiss
+
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.index.d)
+        if self.normalize_L2 and len(vectors):
+            faiss.normalize_L2(vectors)
+
+        updated = JobIndex.__new__(JobIndex)
+        updated.__dict__.update(self.__dict__)
+        updated.ingest_run = ingest_run if ingest_run is not None else self.ingest_run
+        updated.delta_vectors = np.concatenate([self.delta_vectors, vectors])
+        updated.delta_docs = dict(self.delta_docs)
+        new_rows = []
+        for i, doc in enumerate(docs):
+            row = self.ntotal + i
+            updated.delta_docs[row] = doc
+            new_rows.append((row, doc))
+
+        if len(updated.delta_vectors):
+            # delta 는 작으므로 매번 새 Flat 인덱스로 다시 만든다
+            delta = faiss.IndexFlat(self.index.d, self.index.metric_type)
+            delta.add(updated.delta_vectors)
+            updated.delta = delta
+        updated.metadata = self.metadata.updated(new_rows, remove_rows)
+        return updated
+
+    def stats(self):
+        return {
+            "base_vectors": self.base_size,
+            "delta_vectors": len(self.delta_vectors),
+            "ingest_run": self.ingest_run,
+            **self.metadata.stats(),
+        }
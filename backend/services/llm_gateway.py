@@ -0,0 +1,277 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from . import subsystems
+
+# **LLM 설정**
+# LLM_BACKEND: openai | fake (네트워크 없이 동작하는 결정적 응답, 테스트용)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_MODEL = os.getenv("LLM_MODEL", "gpt-3.5-turbo-instruct")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_RATE_PER_SEC = float(os.getenv("LLM_RATE_PER_SEC", "5"))  # 0 이면 제한 없음
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")  # 빈 값이면 캐시 안 함
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+
+class OpenAIBackend:
+    """LangChain OpenAI 클라이언트 하나를 모든 요청이 공유 (temperature 등은 호출마다 전달)"""
+
+    name = "openai"
+
+    def __init__(self, api_key, model=LLM_MODEL):
+        from langchain_community.llms import OpenAI
+
+        self.model = model
+        self.llm = OpenAI(model_name=model, openai_api_key=api_key)
+
+    async def generate(self, prompt, **params):
+        result = await self.llm.agenerate([prompt], **params)
+        usage = (result.llm_output or {}).get("token_usage", {})
+        return result.generations[0][0].text, {
+            "prompt_tokens": usage.get("prompt_tokens", 0),
+            "completion_tokens": usage.get("completion_tokens", 0),
+        }
+
+
+class FakeBackend:
+    """
+    오프라인 테스트용 백엔드. 프롬프트 마지막 입력 블록의 첫 문장들을 줄마다 돌려준다.
+    토큰 수는 공백 단위로 센다.
+    """
+
+    name = "fake"
+    model = None
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    async def generate(self, prompt, **params):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        # 마지막 줄(응답 라벨) 을 빼고, ':' 로 끝나는 마지막 안내 줄 다음부터가 입력
+        lines = prompt.strip().splitlines()[:-1] or [prompt]
+        labels = [i for i, line in enumerate(lines) if line.rstrip().endswith(":")]
+        body = "\n".join(lines[labels[-1] + 1 :] if labels else lines)
+        sentences = [s.strip() for s in re.split(r"(?<=[.!?。])\s+|\n+", body) if s.strip()]
+        text = "\n".join(sentences[:3])[:300]
+        return text, {"prompt_tokens": len(prompt.split()), "completion_tokens": len(text.split())}
+
+
+class ResponseCache:
+    """
+    SQLite 에 저장하는 응답 캐시 (프로세스 재시작 후에도 유지)
+    max_entries 를 넘으면 가장 오래 쓰지 않은 항목부터 삭제
+    """
+
+    def __init__(self, path, max_entries=10000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS llm_responses (
+                key TEXT PRIMARY KEY,
+                response TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_llm_responses_last_used ON llm_responses (last_used);
+            """
+        )
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT response FROM llm_responses WHERE key=?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE llm_responses SET last_used=? WHERE key=?", (time.time(), key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def set(self, key, response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_responses (key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            overflow = self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0] - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM llm_responses WHERE key IN "
+                    "(SELECT key FROM llm_responses ORDER BY last_used LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_responses").fetchone()[0]
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "size": len(self),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class RateLimiter:
+    """초당 rate 개 (최대 burst 개까지 몰아서) 호출을 허용하는 토큰 버킷"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class LLMGateway:
+    """
+    모든 LLM 호출이 거치는 공용 계층
+
+    - 응답 캐시: (프롬프트 템플릿, 입력, 파라미터, 백엔드) 해시 키
+    - 같은 키로 동시에 들어온 요청은 한 번만 호출하고 결과를 공유
+    - 동시 호출 수(max_concurrency) + 초당 호출 수(rate_per_sec) 제한
+    - 호출별 지연시간 / 토큰 수 집계
+    """
+
+    def __init__(self, backend, cache=None, max_concurrency=4, rate_per_sec=0.0):
+        self.backend = backend
+        self.cache = cache
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._rate_limiter = RateLimiter(rate_per_sec)
+        self._inflight = {}
+        self._latencies = deque(maxlen=1000)
+        self.counters = {
+            "requests": 0,
+            "calls": 0,
+            "cache_hits": 0,
+            "coalesced": 0,
+            "errors": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+        }
+
+    def cache_key(self, template, inputs, params):
+        payload = json.dumps(
+            [self.backend.name, getattr(self.backend, "model", None), template, inputs, params],
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def complete(self, template, inputs, **params):
+        """template.format(**inputs) 를 호출한 응답 텍스트"""
+        self.counters["requests"] += 1
+        key = self.cache_key(template, inputs, params)
+
+        if self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                self.counters["cache_hits"] += 1
+                return cached
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.counters["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            text = await self._call(template.format(**inputs), params)
+            if self.cache is not None:
+                await asyncio.to_thread(self.cache.set, key, text)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # 기다리는 요청이 없어도 경고가 나지 않도록
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def _call(self, prompt, params):
+        async with self._slots:
+            await self._rate_limiter.acquire()
+            started = time.perf_counter()
+            try:
+                text, usage = await self.backend.generate(prompt, **params)
+            except Exception:
+                self.counters["errors"] += 1
+                raise
+            self._latencies.append((time.perf_counter() - started) * 1000)
+        self.counters["calls"] += 1
+        self.counters["prompt_tokens"] += usage.get("prompt_tokens", 0)
+        self.counters["completion_tokens"] += usage.get("completion_tokens", 0)
+        return text
+
+    def stats(self):
+        stats = {
+            "backend": self.backend.name,
+            "model": getattr(self.backend, "model", None),
+            "max_concurrency": self.max_concurrency,
+            "rate_per_sec": self._rate_limiter.rate,
+            "inflight": len(self._inflight),
+            **self.counters,
+        }
+        if self._latencies:
+            p50, p95 = np.percentile(list(self._latencies), [50, 95])
+            stats["latency_ms"] = {"p50": round(float(p50), 1), "p95": round(float(p95), 1)}
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+
+def _load():
+    if LLM_BACKEND == "fake":
+        backend = FakeBackend()
+    else:
+        api_key = os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            raise RuntimeError("API 키가 설정되지 않았습니다.")
+        backend = OpenAIBackend(api_key)
+    cache = ResponseCache(LLM_CACHE_PATH, LLM_CACHE_MAX_ENTRIES) if LLM_CACHE_PATH else None
+    return LLMGateway(backend, cache, max_concurrency=LLM_MAX_CONCURRENCY, rate_per_sec=LLM_RATE_PER_SEC)
+
+
+gateway = subsystems.register("llm", _load)
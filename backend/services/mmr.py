@@ -0,0 +1,98 @@
+import re
+
+import numpy as np
+
+from .job_search import JOB_ID_KEYS, metadata_value
+
+
+def _normalize(matrix):
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def mmr_select(query, candidates, k=5, lambda_mult=0.5):
+    """
+    maximal marginal relevance: 질의와 가깝고 이미 고른 것과는 먼 후보를 k 개 선택
+
+    query: (d,), candidates: (n, d) 관련도 순서. 반환: 고른 후보 위치 (선택 순서)
+    후보 간 코사인 유사도 행렬을 한 번만 계산하고, 단계마다 "이미 고른 것과의 최대 유사도" 벡터를
+    np.maximum 으로 갱신한다 (후보별 파이썬 루프 없음, k 번의 벡터 연산).
+    """
+    n = len(candidates)
+    k = min(k, n)
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+
+    candidates = _normalize(np.asarray(candidates, dtype=np.float32))
+    query = _normalize(np.asarray(query, dtype=np.float32).reshape(-1))
+    relevance = candidates @ query  # (n,)
+    similarity = candidates @ candidates.T  # (n, n)
+
+    selected = np.empty(k, dtype=np.int64)
+    redundancy = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected[0] = int(np.argmax(relevance))
+    for step in range(1, k):
+        available[selected[step - 1]] = False
+        redundancy = np.maximum(redundancy, similarity[selected[step - 1]])
+        scores = lambda_mult * relevance - (1 - lambda_mult) * redundancy
+        selected[step] = int(np.argmax(np.where(available, scores, -np.inf)))
+    return selected
+
+
+def normalize_title(title):
+    """기관명 괄호/공백/기호 차이만 있는 같은 공고 제목을 같은 키로"""
+    title = re.sub(r"[\(\[].*?[\)\]]", "", title or "")
+    return re.sub(r"[\W_]+", "", title).lower()
+
+
+def dedupe_key(doc, by):
+    if by == "url":
+        # URL 이 없는 문서는 공고 ID 로 (같은 공고가 두 번 나오지 않도록)
+        return doc.metadata.get("url") or metadata_value(doc, JOB_ID_KEYS) or None
+    if by == "title":
+        first_line = doc.page_content.split("\n", 1)[0]
+        return normalize_title(first_line.removeprefix("채용제목:")) or None
+    return None
+
+
+def unique_positions(docs, by):
+    """같은 URL/제목의 후보 중 가장 관련도가 높은(앞쪽) 하나만 남긴 위치"""
+    if by not in ("url", "title"):
+        return np.arange(len(docs))
+    seen = set()
+    keep = []
+    for i, doc in enumerate(docs):
+        key = dedupe_key(doc, by)
+        if key is not None:
+            if key in seen:
+                continue
+            seen.add(key)
+        keep.append(i)
+    return np.array(keep, dtype=np.int64)
+
+
+def diverse_rows(job_index, query, rows, k=5, lambda_mult=0.5, dedupe="url"):
+    """
+    fetch_k 개 후보 행(관련도 순) -> 중복 제거 -> MMR 로 k 개 (행 번호, Document)
+    저장된 벡터를 꺼낼 수 없는 인덱스면 관련도 순서 그대로 상위 k 개
+    """
+    rows = np.asarray([row for row in rows if row != -1], dtype=np.int64)
+    docs = [job_index.document(row) for row in rows]
+    present = np.array([doc is not None for doc in docs], dtype=bool)
+    rows = rows[present]
+    docs = [doc for doc in docs if doc is not None]
+
+    keep = unique_positions(docs, dedupe)
+    rows = rows[keep]
+    docs = [docs[i] for i in keep]
+
+    vectors = job_index.vectors(rows) if len(rows) > k else None
+    if vectors is None:
+        return rows[:k], docs[:k]
+    selected = mmr_select(query, vectors, k=k, lambda_mult=lambda_mult)
+    return rows[selected], [docs[i] for i in selected]
+
+
+def diverse_rerank(job_index, query, rows, k=5, lambda_mult=0.5, dedupe="url"):
+    return diverse_rows(job_index, query, rows, k=k, lambda_mult=lambda_mult, dedupe=dedupe)[1]
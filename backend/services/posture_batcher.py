@@ -0,0 +1,99 @@
+import asyncio
+
+import numpy as np
+
+
+class PostureBatcher:
+    """
+    여러 WebSocket 세션에서 들어온 프레임을 모아 한 번에 추론하는 스케줄러
+
+    - max_batch_size 개가 모이거나 max_wait_ms 가 지나면 배치를 실행
+    - 추론은 InterpreterPool 에서 checkout 한 인터프리터로 이벤트 루프 밖에서 실행
+    - 각 프레임의 결과는 해당 프레임을 보낸 세션의 future 로 돌려줌
+    """
+
+    def __init__(self, pool, max_batch_size=8, max_wait_ms=10):
+        self.pool = pool
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = None
+        self._task = None
+        self._inflight = set()
+        self.counters = {"batches": 0, "frames": 0, "max_batch": 0}
+
+    def _ensure_started(self):
+        if self._task is None or self._task.done():
+            self._queue = asyncio.Queue()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def submit(self, frame):
+        """프레임 하나(H, W, C)를 큐에 넣고 예측값이 나올 때까지 대기"""
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((frame, future))
+        return await future
+
+    def stats(self):
+        queue_depth = self._queue.qsize() if self._queue is not None else 0
+        return {**self.counters, "queue_depth": queue_depth, "inflight": len(self._inflight)}
+
+    async def _collect(self):
+        frame, future = await self._queue.get()
+        batch = [(frame, future)]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            # 빈 인터프리터가 생길 때까지 프레임을 모아 두었다가 배치로 처리
+            worker = await self.pool.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self.pool.release(worker)
+                raise
+            task = asyncio.get_running_loop().create_task(self._dispatch(worker, batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, worker, batch):
+        try:
+            # 대기 중 연결이 끊긴 세션의 프레임은 제외
+            batch = [(f, fut) for f, fut in batch if not fut.done()]
+            if not batch:
+                return
+
+            inputs = np.stack([f for f, _ in batch])
+            try:
+                predictions = await worker.run(inputs)
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                return
+
+            self.counters["batches"] += 1
+            self.counters["frames"] += len(batch)
+            self.counters["max_batch"] = max(self.counters["max_batch"], len(batch))
+            for (_, fut), pred in zip(batch, predictions):
+                if not fut.done():
+                    fut.set_result(pred)
+        finally:
+            self.pool.release(worker)
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
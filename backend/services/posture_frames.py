@@ -0,0 +1,141 @@
+import asyncio
+from collections import deque
+
+import cv2
+import numpy as np
+
+from .interpreter_pool import FLOAT_INPUT
+
+INPUT_SIZE = (224, 224)
+
+
+class FrameBuffer:
+    """
+    세션마다 하나씩 두는 전처리 버퍼
+
+    JPEG 를 디코드한 뒤 미리 잡아 둔 배열에 resize / 정규화 결과를 덮어써서
+    프레임마다 새 배열을 할당하지 않는다.
+    """
+
+    def __init__(self, size=INPUT_SIZE, input_spec=FLOAT_INPUT):
+        width, height = size
+        self.size = size
+        self.input_spec = input_spec
+        self.resized = np.empty((height, width, 3), dtype=np.uint8)
+        self.input = np.empty((height, width, 3), dtype=input_spec.dtype)
+        # 양자화(정수) 입력일 때만 쓰는 중간 계산 버퍼 (float16 등 부동소수 입력은 정규화만)
+        self._scratch = None
+        if not np.issubdtype(input_spec.dtype, np.floating):
+            self._scratch = np.empty((height, width, 3), dtype=np.float32)
+
+    def load_jpeg(self, data):
+        """JPEG 바이트를 디코드해서 resized 버퍼에 채움. 디코드 실패 시 False"""
+        img = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+        if img is None:
+            return False
+        cv2.resize(img, self.size, dst=self.resized)
+        return True
+
+    def to_input(self):
+        """resized 버퍼를 모델 입력 dtype 에 맞게 변환해서 input 버퍼에 기록"""
+        spec = self.input_spec
+        if self._scratch is None:
+            # float32 / float16 입력 모델: 0~1 정규화
+            np.multiply(self.resized, 1.0 / 255.0, out=self.input, casting="unsafe")
+            return self.input
+
+        # 양자화 모델: q = (pixel / 255) / scale + zero_point
+        np.multiply(self.resized, 1.0 / (255.0 * spec.scale), out=self._scratch, casting="unsafe")
+        self._scratch += spec.zero_point
+        np.rint(self._scratch, out=self._scratch)
+        info = np.iinfo(spec.dtype)
+        np.clip(self._scratch, info.min, info.max, out=self._scratch)
+        np.copyto(self.input, self._scratch, casting="unsafe")
+        return self.input
+
+
+class LatestFrameSlot:
+    """
+    세션별 최신 프레임 한 장만 보관 (latest-frame-wins)
+
+    추론이 끝나기 전에 새 프레임이 오면 이전 프레임은 버리고 dropped 를 센다.
+    """
+
+    def __init__(self):
+        self._data = None
+        self._event = asyncio.Event()
+        self.closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, data):
+        if self._data is not None:
+            self.dropped += 1
+        self._data = data
+        self.received += 1
+        self._event.set()
+
+    async def get(self):
+        """다음 프레임을 기다려 반환. 연결이 닫히면 None"""
+        while self._data is None:
+            if self.closed:
+                return None
+            self._event.clear()
+            await self._event.wait()
+        data, self._data = self._data, None
+        return data
+
+    def close(self):
+        self.closed = True
+        self._event.set()
+
+
+class ChangeDetector:
+    """
+    저해상도 흑백 차이로 프레임 변화 여부를 판단
+
+    마지막으로 추론한 프레임과 비교해서 평균 픽셀 차이(0~255)가 threshold 미만이면
+    변화 없음으로 본다. max_skip 번 연속으로 건너뛰면 한 번은 강제로 추론한다.
+    """
+
+    def __init__(self, threshold=2.0, grid=(16, 16), max_skip=30):
+        self.threshold = threshold
+        self.grid = grid
+        self.max_skip = max_skip
+        self._reference = None
+        self._small = np.empty((grid[1], grid[0]), dtype=np.uint8)
+        self._consecutive = 0
+        self.frames = 0
+        self.skipped = 0
+
+    def is_unchanged(self, resized):
+        """resized: (224, 224, 3) uint8. 변화가 없으면 True (추론 생략)"""
+        self.frames += 1
+        gray = cv2.cvtColor(resized, cv2.COLOR_BGR2GRAY)
+        cv2.resize(gray, self.grid, dst=self._small, interpolation=cv2.INTER_AREA)
+
+        if self._reference is not None and self._consecutive < self.max_skip:
+            diff = cv2.absdiff(self._small, self._reference).mean()
+            if diff < self.threshold:
+                self._consecutive += 1
+                self.skipped += 1
+                return True
+
+        self._reference = self._small.copy()
+        self._consecutive = 0
+        return False
+
+    @property
+    def skip_ratio(self):
+        return self.skipped / self.frames if self.frames else 0.0
+
+
+class PredictionSmoother:
+    """최근 window 개 예측 확률의 평균으로 라벨을 정함 (window=1 이면 smoothing 없음)"""
+
+    def __init__(self, window=1):
+        self._history = deque(maxlen=max(1, window))
+
+    def add(self, predictions):
+        self._history.append(np.asarray(predictions, dtype=np.float32))
+        return np.mean(self._history, axis=0)
@@ -0,0 +1,132 @@
+import asyncio
+import os
+
+import numpy as np
+
+from .interpreter_pool import InterpreterPool
+from .posture_batcher import PostureBatcher
+from . import subsystems
+from .posture_frames import ChangeDetector, FrameBuffer, PredictionSmoother
+
+# 모델 변형 선택 (float32 | float16 | int8). POSTURE_MODEL_PATH 를 주면 그 파일을 그대로 사용
+MODEL_DIR = os.getenv("POSTURE_MODEL_DIR", "/Users/1tae/Desktop/bp/backend/models")
+MODEL_VARIANTS = {
+    "float32": "model_unquant.tflite",
+    "float16": "model_float16.tflite",
+    "int8": "model_int8.tflite",
+}
+POSTURE_MODEL_VARIANT = os.getenv("POSTURE_MODEL_VARIANT", "float32")
+
+
+def model_path(variant=POSTURE_MODEL_VARIANT):
+    path = os.getenv("POSTURE_MODEL_PATH")
+    if path:
+        return path
+    # 오타가 float32 로 조용히 바뀌어 배포되지 않도록 모르는 변형은 오류
+    if variant not in MODEL_VARIANTS:
+        raise ValueError(f"Unknown POSTURE_MODEL_VARIANT {variant!r} (expected one of {', '.join(MODEL_VARIANTS)})")
+    return os.path.join(MODEL_DIR, MODEL_VARIANTS[variant])
+
+
+class_names = ["confident", "unconfident"]
+
+# 인터프리터 풀 설정 (backend: thread | process)
+POSTURE_POOL_BACKEND = os.getenv("POSTURE_POOL_BACKEND", "thread")
+POSTURE_POOL_SIZE = int(os.getenv("POSTURE_POOL_SIZE", "0")) or None  # 0 이면 CPU 코어 수
+POSTURE_NUM_THREADS = int(os.getenv("POSTURE_NUM_THREADS", "1"))
+
+# 마이크로 배칭 설정
+POSTURE_MAX_BATCH_SIZE = int(os.getenv("POSTURE_MAX_BATCH_SIZE", "8"))
+POSTURE_MAX_WAIT_MS = float(os.getenv("POSTURE_MAX_WAIT_MS", "10"))
+
+# 변화 없는 프레임 건너뛰기 / 라벨 smoothing 설정 (threshold 0 이면 건너뛰지 않음)
+POSTURE_CHANGE_THRESHOLD = float(os.getenv("POSTURE_CHANGE_THRESHOLD", "2.0"))
+POSTURE_MAX_SKIP = int(os.getenv("POSTURE_MAX_SKIP", "30"))
+POSTURE_SMOOTHING_WINDOW = int(os.getenv("POSTURE_SMOOTHING_WINDOW", "1"))
+
+
+def _load():
+    # 잘못된 변형 이름도 여기서 실패해야 앱 전체가 아니라 posture 만 /health/ready 에 실패로 표시됨
+    pool = InterpreterPool(
+        model_path(),
+        size=POSTURE_POOL_SIZE,
+        num_threads=POSTURE_NUM_THREADS,
+        backend=POSTURE_POOL_BACKEND,
+    )
+    batcher = PostureBatcher(
+        pool, max_batch_size=POSTURE_MAX_BATCH_SIZE, max_wait_ms=POSTURE_MAX_WAIT_MS
+    )
+    print(f"TensorFlow Lite 모델 로드 성공 ({POSTURE_MODEL_VARIANT}, {pool.backend} x {pool.size})")
+    return pool, batcher
+
+
+# TensorFlow Lite 모델은 처음 쓸 때 또는 warm-up 때 로드
+posture = subsystems.register("posture", _load)
+
+
+async def open_session():
+    """새 WebSocket 세션 상태를 만든다. 모델을 쓸 수 없으면 None"""
+    try:
+        pool, batcher = await posture.aget()
+    except RuntimeError:
+        return None
+    return PostureSession(pool, batcher)
+
+
+# 전체 세션 합산 프레임 / 건너뛴 프레임 수
+skip_counters = {"frames": 0, "skipped": 0}
+
+
+class PostureSession:
+    """WebSocket 연결 하나의 전처리 버퍼, 변화 감지, smoothing 상태"""
+
+    def __init__(self, pool, batcher):
+        self.batcher = batcher
+        self.frame = FrameBuffer(input_spec=pool.input_spec)
+        self.detector = None
+        if POSTURE_CHANGE_THRESHOLD > 0:
+            self.detector = ChangeDetector(POSTURE_CHANGE_THRESHOLD, max_skip=POSTURE_MAX_SKIP)
+        self.smoother = PredictionSmoother(POSTURE_SMOOTHING_WINDOW)
+        self.last_predictions = None
+        self.label = None
+
+    async def analyze(self, jpeg_bytes):
+        """JPEG 프레임 하나를 분석해서 라벨 반환. 디코드 실패 시 None"""
+        if not await asyncio.to_thread(self.frame.load_jpeg, jpeg_bytes):
+            return None
+
+        skip_counters["frames"] += 1
+        if (
+            self.detector is not None
+            and self.last_predictions is not None
+            and self.detector.is_unchanged(self.frame.resized)
+        ):
+            # 직전 프레임과 거의 같으면 이전 결과 재사용
+            skip_counters["skipped"] += 1
+            return self.label
+
+        predictions = await self.batcher.submit(self.frame.to_input())
+        self.last_predictions = predictions
+        self.label = class_names[np.argmax(self.smoother.add(predictions))]
+        return self.label
+
+    @property
+    def skip_ratio(self):
+        return self.detector.skip_ratio if self.detector is not None else 0.0
+
+
+def stats():
+    if not posture.ready:
+        return {"loaded": False, **posture.status()}
+    pool, batcher = posture.value
+    frames = skip_counters["frames"]
+    return {
+        "loaded": True,
+        "model_variant": POSTURE_MODEL_VARIANT,
+        "pool": pool.stats(),
+        "batcher": batcher.stats(),
+        "skip": {
+            **skip_counters,
+            "skip_ratio": round(skip_counters["skipped"] / frames, 4) if frames else 0.0,
+        },
+    }
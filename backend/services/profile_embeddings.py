@@ -0,0 +1,121 @@
+import asyncio
+import hashlib
+import logging
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import select
+
+from . import subsystems
+from ..database import AsyncSessionLocal
+from ..models import User, UserProfileEmbedding
+
+logger = logging.getLogger(__name__)
+
+# User 컬럼 -> 프로필 항목 (추천 질의 텍스트)
+PROFILE_FIELDS = [
+    ("desired_position", "희망 직종"),
+    ("desired_location", "희망 근무지"),
+    ("skills", "보유 기술"),
+    ("experience", "경력"),
+    ("certifications", "자격증"),
+]
+
+# 백그라운드 재계산은 한 번에 하나씩 (검색 요청과 임베딩 모델을 나눠 씀)
+_refresh_slots = asyncio.Semaphore(1)
+_pending = {}
+
+
+def profile_text(user):
+    """비어 있지 않은 프로필 항목을 한 줄씩. 모두 비어 있으면 빈 문자열"""
+    lines = [f"{label}: {getattr(user, field)}" for field, label in PROFILE_FIELDS if getattr(user, field)]
+    return "\n".join(lines)
+
+
+def profile_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def model_name(job_index):
+    return getattr(job_index.embeddings, "model_name", type(job_index.embeddings).__name__)
+
+
+async def load_profile(db, user_id):
+    """(프로필 텍스트, 해시). 사용자가 없으면 None"""
+    fields = [getattr(User, field) for field, _ in PROFILE_FIELDS]
+    row = (await db.execute(select(*fields).where(User.id == user_id))).first()
+    if row is None:
+        return None
+    text = profile_text(row)
+    return text, profile_hash(text)
+
+
+async def stored_embedding(db, user_id, name, expected_hash=None):
+    """저장된 임베딩 벡터 (없거나 프로필이 바뀌었으면 None)"""
+    row = await db.get(UserProfileEmbedding, (user_id, name))
+    if row is None or (expected_hash is not None and row.profile_hash != expected_hash):
+        return None
+    return np.frombuffer(row.vector, dtype=np.float32)
+
+
+async def save_embedding(db, user_id, name, digest, vector):
+    vector = np.asarray(vector, dtype=np.float32)
+    row = await db.get(UserProfileEmbedding, (user_id, name))
+    if row is None:
+        row = UserProfileEmbedding(user_id=user_id, model_name=name)
+        db.add(row)
+    row.profile_hash = digest
+    row.dim = vector.shape[0]
+    row.vector = vector.tobytes()
+    row.updated_at = datetime.utcnow()
+    await db.commit()
+    return vector
+
+
+async def refresh(user_id, job_index=None):
+    """
+    사용자의 프로필 임베딩을 현재 임베딩 모델로 다시 계산해서 저장
+    프로필이 비었거나 해시가 같으면 계산하지 않음
+    """
+    if job_index is None:
+        job_index = await subsystems.registry["rag"].aget()
+    name = model_name(job_index)
+    async with AsyncSessionLocal() as db:
+        profile = await load_profile(db, user_id)
+        if profile is None or not profile[0]:
+            return None
+        text, digest = profile
+        vector = await stored_embedding(db, user_id, name, digest)
+        if vector is not None:
+            return vector
+        await db.close()  # 임베딩 계산 동안 커넥션을 풀에 돌려줌 (저장할 때 다시 잡음)
+        async with _refresh_slots:
+            embedded = await asyncio.to_thread(job_index.embeddings.embed_query, text)
+        return await save_embedding(db, user_id, name, digest, embedded)
+
+
+def schedule_refresh(user_id):
+    """
+    register / update_resume 후 호출: 백그라운드에서 임베딩 재계산
+    같은 사용자의 재계산이 이미 진행 중이면 그 작업이 끝난 뒤 한 번 더 (최신 값 반영)
+    """
+    rag = subsystems.registry.get("rag")
+    if rag is None:
+        return
+    previous = _pending.get(user_id)
+
+    async def run():
+        if previous is not None:
+            await asyncio.gather(previous, return_exceptions=True)
+        try:
+            await refresh(user_id)
+        except RuntimeError as e:  # 벡터 스토어를 쓸 수 없음 -> 추천 요청 때 계산
+            logger.info("Profile embedding refresh skipped for %s: %s", user_id, e)
+        except Exception:
+            logger.exception("Profile embedding refresh failed for %s", user_id)
+        finally:
+            if _pending.get(user_id) is task:
+                del _pending[user_id]
+
+    task = asyncio.create_task(run())
+    _pending[user_id] = task
@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from .caches import LRUCache
+
+# **면접 세션 저장소 설정**
+# QUESTION_STORE: memory (워커별) | sqlite (여러 uvicorn 워커가 같은 파일을 공유)
+QUESTION_STORE = os.getenv("QUESTION_STORE", "memory")
+QUESTION_STORE_PATH = os.getenv("QUESTION_STORE_PATH", "interview_sessions.sqlite3")
+QUESTION_SESSION_TTL = float(os.getenv("QUESTION_SESSION_TTL", "3600"))
+QUESTION_STORE_MAX_SESSIONS = int(os.getenv("QUESTION_STORE_MAX_SESSIONS", "10000"))
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+class MemoryQuestionStore:
+    """세션 ID -> 질문 목록. 세션 수 제한(LRU) + TTL 만료"""
+
+    backend = "memory"
+
+    def __init__(self, max_sessions=10000, ttl=3600.0):
+        self.sessions = LRUCache(maxsize=max_sessions, ttl=ttl)
+
+    def create(self, questions):
+        session_id = new_session_id()
+        self.sessions.set(session_id, list(questions))
+        return session_id
+
+    def get(self, session_id):
+        return self.sessions.get(session_id)
+
+    def stats(self):
+        return {"backend": self.backend, **self.sessions.stats()}
+
+
+class SqliteQuestionStore:
+    """
+    SQLite 파일에 저장하는 세션 저장소 (WAL 모드, 세션 ID 기본 키 조회)
+    만료된 세션은 새 세션을 만들 때 정리하고, max_sessions 를 넘으면 오래된 세션부터 삭제
+    """
+
+    backend = "sqlite"
+
+    def __init__(self, path, max_sessions=10000, ttl=3600.0):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS interview_sessions (
+                session_id TEXT PRIMARY KEY,
+                questions TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_interview_sessions_expires_at ON interview_sessions (expires_at);
+            """
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def create(self, questions):
+        session_id = new_session_id()
+        now = time.time()
+        with self._lock:
+            self._conn.execute("DELETE FROM interview_sessions WHERE expires_at <= ?", (now,))
+            self._conn.execute(
+                "INSERT INTO interview_sessions (session_id, questions, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (session_id, json.dumps(list(questions), ensure_ascii=False), now, now + self.ttl),
+            )
+            self._conn.execute(
+                "DELETE FROM interview_sessions WHERE session_id IN "
+                "(SELECT session_id FROM interview_sessions ORDER BY expires_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_sessions,),
+            )
+            self._conn.commit()
+        return session_id
+
+    def get(self, session_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT questions FROM interview_sessions WHERE session_id=? AND expires_at > ?",
+                (session_id, time.time()),
+            ).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute(
+                "SELECT COUNT(*) FROM interview_sessions WHERE expires_at > ?", (time.time(),)
+            ).fetchone()[0]
+        return {
+            "backend": self.backend,
+            "path": self.path,
+            "size": size,
+            "max_sessions": self.max_sessions,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def make_store():
+    if QUESTION_STORE == "sqlite":
+        return SqliteQuestionStore(QUESTION_STORE_PATH, QUESTION_STORE_MAX_SESSIONS, QUESTION_SESSION_TTL)
+    return MemoryQuestionStore(QUESTION_STORE_MAX_SESSIONS, QUESTION_SESSION_TTL)
+
+
+question_store = make_store()
@@ -0,0 +1,62 @@
+import hashlib
+
+from sqlalchemy import func, select
+
+from ..models import ResumeFile
+
+RESUME_KINDS = {
+    "pdf": "application/pdf",
+    "word": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+def resume_file_values(kind, data, filename=None, content_type=None):
+    return {
+        "filename": filename,
+        "content_type": content_type or RESUME_KINDS[kind],
+        "size": len(data),
+        "sha256": hashlib.sha256(data).hexdigest(),
+        "data": data,
+    }
+
+
+async def save_resume_file(db, user_id, kind, data, filename=None, content_type=None):
+    """사용자의 이력서 파일(kind 별 하나)을 추가하거나 교체. commit 은 호출한 쪽에서"""
+    resume_file = await get_resume_file(db, user_id, kind)
+    if resume_file is None:
+        resume_file = ResumeFile(user_id=user_id, kind=kind)
+        db.add(resume_file)
+    for key, value in resume_file_values(kind, data, filename, content_type).items():
+        setattr(resume_file, key, value)
+    return resume_file
+
+
+async def list_resume_files(db, user_id):
+    """파일 데이터 없이 메타데이터만"""
+    rows = (await db.execute(select(ResumeFile).where(ResumeFile.user_id == user_id))).scalars()
+    return [
+        {"kind": f.kind, "filename": f.filename, "content_type": f.content_type, "size": f.size, "sha256": f.sha256}
+        for f in rows
+    ]
+
+
+async def get_resume_file(db, user_id, kind):
+    result = await db.execute(select(ResumeFile).where(ResumeFile.user_id == user_id, ResumeFile.kind == kind))
+    return result.scalar_one_or_none()
+
+
+async def iter_resume_file(session_factory, file_id, size, chunk_size=256 * 1024):
+    """
+    파일 데이터를 chunk_size 씩 잘라서 읽는 제너레이터 (SUBSTRING 으로 DB 에서 조각만 가져옴)
+    전체 BLOB 을 메모리에 올리지 않고 StreamingResponse 로 보냄
+    """
+    async with session_factory() as db:
+        for offset in range(0, size, chunk_size):
+            chunk = (
+                await db.execute(
+                    select(func.substr(ResumeFile.data, offset + 1, chunk_size)).where(ResumeFile.id == file_id)
+                )
+            ).scalar()
+            if not chunk:
+                break
+            yield bytes(chunk)
@@ -0,0 +1,147 @@
+import asyncio
+import hashlib
+import os
+import tempfile
+import threading
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .caches import LRUCache
+
+LOADERS = {".pdf": "pdf", ".docx": "docx"}
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class ParseTimeout(Exception):
+    pass
+
+
+class ParseCrashed(Exception):
+    """파싱 중 워커 프로세스가 죽어 풀이 깨짐 (문서 자체의 문제로 보고 다시 시도하지 않음)"""
+
+
+async def save_upload(file, max_bytes, chunk_size=1024 * 1024, directory=None):
+    """
+    업로드를 chunk_size 단위로 임시 파일에 쓰면서 sha256 계산
+    max_bytes 를 넘으면 파일을 지우고 UploadTooLarge
+    반환: (임시 파일 경로, 내용 해시)
+    """
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(delete=False, dir=directory) as tmp_file:
+        try:
+            while True:
+                chunk = await file.read(chunk_size)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"upload exceeds {max_bytes} bytes")
+                digest.update(chunk)
+                # 디스크 쓰기도 이벤트 루프 밖에서
+                await asyncio.to_thread(tmp_file.write, chunk)
+        except BaseException:
+            tmp_file.close()
+            os.remove(tmp_file.name)
+            raise
+    return tmp_file.name, digest.hexdigest()
+
+
+def _extract(path, kind):
+    """(프로세스 워커) 문서 로드 후 피클하기 쉬운 (본문, 메타데이터) 목록으로 반환"""
+    from langchain_community.document_loaders import Docx2txtLoader, PyPDFLoader
+
+    loader = PyPDFLoader(path) if kind == "pdf" else Docx2txtLoader(path)
+    return [(doc.page_content, doc.metadata) for doc in loader.load()]
+
+
+class ResumeParser:
+    """
+    이력서 파싱 전용 프로세스 풀 + 내용 해시별 추출 텍스트 캐시
+
+    - 문서당 timeout 초를 넘기면 워커 프로세스를 종료하고 풀을 새로 만든다
+      (멈춘 스캔 PDF 가 워커를 계속 붙잡지 않도록)
+    - 그때 함께 끊긴 다른 문서의 파싱은 새 풀에서 다시 실행 (최대 restart_retries 번)
+    - 다른 요청이 풀을 바꾸지 않았는데 풀이 깨졌으면 이 문서가 워커를 죽인 것으로 보고
+      풀만 새로 만든 뒤 ParseCrashed (같은 문서로 새 풀을 또 깨뜨리지 않도록)
+    - 같은 파일을 다시 올리면 파싱 없이 캐시 결과 사용
+    """
+
+    def __init__(self, max_workers=2, timeout=30.0, cache_size=256, restart_retries=2):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.restart_retries = restart_retries
+        self.cache = LRUCache(maxsize=cache_size)
+        self._executor = None
+        self._lock = threading.Lock()
+        self.parsed = 0
+        self.timeouts = 0
+        self.retries = 0
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    def _restart(self, executor):
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = None
+        # 실행 중인 작업은 취소할 수 없으므로 프로세스를 직접 종료
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    async def parse(self, path, kind, digest):
+        """(본문, 메타데이터) 목록. 시간 초과 시 ParseTimeout, 이 문서가 워커를 죽이면 ParseCrashed"""
+        cached = self.cache.get(digest)
+        if cached is not None:
+            return cached
+
+        loop = asyncio.get_running_loop()
+        for attempt in range(self.restart_retries + 1):
+            executor = self._get_executor()
+            try:
+                pages = await asyncio.wait_for(loop.run_in_executor(executor, _extract, path, kind), self.timeout)
+                break
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                self._restart(executor)
+                raise ParseTimeout(f"parsing took longer than {self.timeout}s")
+            except (BrokenProcessPool, CancelledError, asyncio.CancelledError) as e:
+                if isinstance(e, asyncio.CancelledError) and asyncio.current_task().cancelling():
+                    raise  # 요청 자체가 취소됨
+                with self._lock:
+                    replaced = self._executor is not executor
+                if not replaced:
+                    # 다른 요청이 재시작한 게 아니라 이 파싱 중에 풀이 깨짐
+                    self._restart(executor)
+                    raise ParseCrashed("parser worker died while parsing this document") from e
+                # 다른 문서의 시간 초과 등으로 재시작된 풀에서 끊긴 작업 -> 새 풀에서 다시 실행
+                if attempt == self.restart_retries:
+                    raise BrokenProcessPool("parser pool restarted while parsing") from e
+                self.retries += 1
+        self.parsed += 1
+        self.cache.set(digest, pages)
+        return pages
+
+    def close(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        return {
+            "max_workers": self.max_workers,
+            "timeout": self.timeout,
+            "parsed": self.parsed,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "cache": self.cache.stats(),
+        }
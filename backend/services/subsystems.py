@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+
+class Subsystem:
+    """
+    무거운 초기화(모델, 벡터 스토어, DB 스키마)를 처음 쓸 때 또는 백그라운드 warm-up 때 한 번만 수행
+
+    상태: pending -> loading -> ready | failed
+    실패하면 retry_interval 초가 지난 뒤 다음 사용 시점에 다시 시도한다.
+    """
+
+    def __init__(self, name, loader, retry_interval=30.0):
+        self.name = name
+        self.loader = loader
+        self.retry_interval = retry_interval
+        self.state = "pending"
+        self.value = None
+        self.error = None
+        self.load_seconds = None
+        self.loaded_at = None
+        self._failed_at = None
+        self._lock = threading.Lock()
+        # reload() 로 값이 교체된 뒤 호출할 콜백 (캐시 무효화 등)
+        self.on_reload = []
+
+    @property
+    def ready(self):
+        return self.state == "ready"
+
+    def get(self):
+        """초기화가 안 됐으면 (블로킹으로) 초기화하고 결과를 반환. 실패 시 RuntimeError"""
+        if self.state == "ready":
+            return self.value
+        with self._lock:
+            if self.state == "ready":
+                return self.value
+            if self.state == "failed" and time.monotonic() - self._failed_at < self.retry_interval:
+                raise RuntimeError(f"{self.name} unavailable: {self.error}")
+
+            self.state = "loading"
+            started = time.perf_counter()
+            try:
+                self.value = self.loader()
+            except Exception as e:
+                self.state = "failed"
+                self.error = str(e)
+                self._failed_at = time.monotonic()
+                self.load_seconds = round(time.perf_counter() - started, 3)
+                print(f"[{self.name}] 초기화 실패: {e}")
+                raise RuntimeError(f"{self.name} unavailable: {e}") from e
+
+            self.state = "ready"
+            self.error = None
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            self.loaded_at = time.time()
+            print(f"[{self.name}] 초기화 완료 ({self.load_seconds}s)")
+            return self.value
+
+    def reload(self):
+        """새 값을 따로 로드한 뒤 교체. 로드하는 동안에도 기존 값으로 계속 서비스"""
+        started = time.perf_counter()
+        value = self.loader()
+        with self._lock:
+            self.value = value
+            self.state = "ready"
+            self.error = None
+            self.load_seconds = round(time.perf_counter() - started, 3)
+            self.loaded_at = time.time()
+        for callback in self.on_reload:
+            callback()
+        print(f"[{self.name}] 다시 로드 완료 ({self.load_seconds}s)")
+        return value
+
+    def swap(self, value, expected):
+        """
+        현재 값이 expected 일 때만 value 로 교체 (그 사이 reload 됐으면 교체하지 않음)
+        교체 전에 값을 가져간 요청은 기존 객체로 끝까지 처리된다.
+        """
+        with self._lock:
+            if self.value is not expected:
+                return False
+            self.value = value
+        for callback in self.on_reload:
+            callback()
+        return True
+
+    async def aget(self):
+        """이벤트 루프를 막지 않도록 초기화는 스레드에서 수행"""
+        if self.state == "ready":
+            return self.value
+        return await asyncio.to_thread(self.get)
+
+    def status(self):
+        return {
+            "state": self.state,
+            "load_seconds": self.load_seconds,
+            "loaded_at": self.loaded_at,
+            "error": self.error,
+        }
+
+
+registry = {}
+
+
+def register(name, loader, **kwargs):
+    subsystem = Subsystem(name, loader, **kwargs)
+    registry[name] = subsystem
+    return subsystem
+
+
+async def warm_up():
+    """등록된 서브시스템을 서로 기다리지 않고 백그라운드에서 초기화"""
+
+    async def load(subsystem):
+        try:
+            await subsystem.aget()
+        except RuntimeError:
+            pass
+
+    await asyncio.gather(*(load(s) for s in registry.values()))
@@ -0,0 +1,108 @@
+import asyncio
+import hashlib
+import os
+
+from . import subsystems
+from .caches import LRUCache
+from .llm_gateway import gateway
+
+# 프롬프트를 바꾸면 버전을 올려서 이전 요약 캐시를 쓰지 않도록
+PROMPT_VERSION = "v1"
+
+SUMMARY_PROMPT = """
+다음 내용을 한 문장으로 요약하세요:
+{text}
+요약:"""
+
+MAP_PROMPT = """
+다음은 이력서의 일부입니다. 핵심 경력, 학력, 자격, 기술을 두세 문장으로 요약하세요:
+{text}
+요약:"""
+
+REDUCE_PROMPT = """
+다음은 한 이력서를 나누어 요약한 내용입니다. 전체를 한 문장으로 요약하세요:
+{text}
+요약:"""
+
+# **요약 설정** (LLM 백엔드는 llm_gateway 의 LLM_BACKEND, fake 로 오프라인 테스트)
+SUMMARY_CHUNK_SIZE = int(os.getenv("SUMMARY_CHUNK_SIZE", "3000"))
+SUMMARY_CHUNK_OVERLAP = int(os.getenv("SUMMARY_CHUNK_OVERLAP", "200"))
+SUMMARY_MAX_CONCURRENCY = int(os.getenv("SUMMARY_MAX_CONCURRENCY", "4"))
+SUMMARY_CACHE_SIZE = int(os.getenv("SUMMARY_CACHE_SIZE", "512"))
+
+
+def document_hash(texts):
+    digest = hashlib.sha256()
+    for text in texts:
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+class Summarizer:
+    """
+    긴 문서는 청크로 나눠 동시에 요약(map)한 뒤 합쳐서 다시 요약(reduce)
+
+    - 짧은 문서는 한 번의 호출로 요약 (기존 stuff 방식과 같은 프롬프트)
+    - 청크 요약을 합친 길이가 chunk_size 를 넘으면 reduce 를 반복
+    - 최종 요약은 (문서 해시, PROMPT_VERSION) 으로 캐시
+    """
+
+    def __init__(self, llm_gateway, chunk_size=3000, chunk_overlap=200, max_concurrency=4, cache_size=512):
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+        self.llm_gateway = llm_gateway
+        self.chunk_size = chunk_size
+        self.splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self.max_concurrency = max_concurrency
+        self.cache = LRUCache(maxsize=cache_size)
+        self.llm_calls = 0
+
+    async def _complete(self, prompt, text, semaphore):
+        async with semaphore:
+            self.llm_calls += 1
+            result = await self.llm_gateway.complete(prompt, {"text": text}, temperature=0.7)
+        return result.strip()
+
+    async def _reduce(self, summaries, semaphore):
+        while True:
+            combined = "\n".join(summaries)
+            if len(combined) <= self.chunk_size or len(summaries) == 1:
+                return await self._complete(REDUCE_PROMPT, combined, semaphore)
+            groups = self.splitter.split_text(combined)
+            summaries = await asyncio.gather(*(self._complete(MAP_PROMPT, group, semaphore) for group in groups))
+
+    async def summarize(self, texts, doc_hash=None):
+        """texts: 페이지별 본문. doc_hash 를 주면 (업로드 내용 해시 등) 그대로 캐시 키에 사용"""
+        key = (doc_hash or document_hash(texts), PROMPT_VERSION)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        text = "\n\n".join(texts)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        if len(text) <= self.chunk_size:
+            summary = await self._complete(SUMMARY_PROMPT, text, semaphore)
+        else:
+            chunks = self.splitter.split_text(text)
+            summaries = await asyncio.gather(*(self._complete(MAP_PROMPT, chunk, semaphore) for chunk in chunks))
+            summary = await self._reduce(list(summaries), semaphore)
+
+        self.cache.set(key, summary)
+        return summary
+
+    def stats(self):
+        return {"prompt_version": PROMPT_VERSION, "llm_calls": self.llm_calls, "cache": self.cache.stats()}
+
+
+def _load():
+    return Summarizer(
+        gateway.get(),
+        chunk_size=SUMMARY_CHUNK_SIZE,
+        chunk_overlap=SUMMARY_CHUNK_OVERLAP,
+        max_concurrency=SUMMARY_MAX_CONCURRENCY,
+        cache_size=SUMMARY_CACHE_SIZE,
+    )
+
+
+summarizer = subsystems.register("summarizer", _load)
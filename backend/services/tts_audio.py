@@ -0,0 +1,309 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+
+# **TTS 설정**
+# TTS_ENGINE: gtts | fake (네트워크 없이 무음 MP3 를 만드는 테스트용 엔진)
+TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts")
+TTS_LANG = os.getenv("TTS_LANG", "ko")
+TTS_VOICE = os.getenv("TTS_VOICE", "com")  # gTTS 는 tld 로 억양을 고름
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "tts_cache")  # /tts/audio/<해시>.mp3 로 서빙
+TTS_CACHE_MAX_MB = float(os.getenv("TTS_CACHE_MAX_MB", "200"))
+TTS_MAX_CONCURRENCY = int(os.getenv("TTS_MAX_CONCURRENCY", "2"))
+# 스트리밍으로 재생을 기다리는 합성에만 쓰는 추가 슬롯 수 (미리 합성이 일반 슬롯을 다 잡고 있어도 바로 시작)
+TTS_URGENT_CONCURRENCY = int(os.getenv("TTS_URGENT_CONCURRENCY", "2"))
+
+
+class GTTSEngine:
+    name = "gtts"
+
+    def stream(self, text, lang, voice):
+        """문장 단위로 합성되는 대로 MP3 바이트를 내보냄"""
+        from gtts import gTTS
+
+        yield from gTTS(text=text, lang=lang, tld=voice).stream()
+
+
+class FakeEngine:
+    """오프라인 테스트용: 글자 수에 비례하는 길이의 무음 MP3 프레임을 기록"""
+
+    name = "fake"
+    # MPEG-1 Layer III, 128kbps, 44.1kHz 프레임 (417 bytes, 약 26ms)
+    FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.calls = 0
+
+    def stream(self, text, lang, voice):
+        self.calls += 1
+        for _ in range(max(1, len(text) // 8)):
+            if self.delay:
+                time.sleep(self.delay)
+            yield self.FRAME * 32
+
+
+ENGINES = {"gtts": GTTSEngine, "fake": FakeEngine}
+AUDIO_FILE_NAME = re.compile(r"[0-9a-f]{64}\.mp3")
+
+
+def audio_key(text, lang, voice, engine_name):
+    return hashlib.sha256("\x1f".join([engine_name, lang, voice, text]).encode("utf-8")).hexdigest()
+
+
+class Synthesis:
+    """
+    진행 중인 합성 하나. 합성 스레드가 내보내는 조각을 모아 두고 스트리밍 구독자들에게 나눠 줌
+    (늦게 붙은 구독자는 이미 나온 조각부터 받음)
+    """
+
+    def __init__(self, loop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.chunks = []
+        self.listeners = set()
+        self.urgent = asyncio.Event()  # 재생을 기다리는 클라이언트가 있으면 급한 슬롯도 씀
+
+    def publish(self, chunk):
+        """합성 스레드에서 호출"""
+        self.loop.call_soon_threadsafe(self._publish, chunk)
+
+    def _publish(self, chunk):
+        self.chunks.append(chunk)
+        for queue in self.listeners:
+            queue.put_nowait(chunk)
+
+    def finish(self, path=None, error=None):
+        if error is None:
+            self.future.set_result(path)
+        else:
+            self.future.set_exception(error)
+            self.future.exception()
+        for queue in self.listeners:
+            queue.put_nowait(None)
+
+    async def subscribe(self):
+        queue = asyncio.Queue()
+        for chunk in self.chunks:
+            queue.put_nowait(chunk)
+        if self.future.done():
+            queue.put_nowait(None)
+        self.listeners.add(queue)
+        self.urgent.set()
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+        finally:
+            self.listeners.discard(queue)
+        self.future.result()
+
+
+class AudioCache:
+    """
+    (텍스트, 언어, 음성) 해시를 파일 이름으로 쓰는 TTS 음성 캐시
+
+    - 이미 있는 파일은 바로 반환 (사용할 때마다 mtime 을 갱신해서 LRU 순서로 사용)
+    - 같은 음성을 동시에 요청하면 한 번만 합성하고, 스트리밍 요청은 진행 중인 합성에 붙어서 조각을 받음
+    - 미리 합성은 max_concurrency 개까지 스레드에서 동시에 실행
+      (스트리밍으로 재생을 기다리는 음성은 별도의 급한 슬롯 urgent_concurrency 개도 함께 노려서 먼저 합성,
+      그래도 동시 합성은 max_concurrency + urgent_concurrency 개를 넘지 않음)
+    - 디렉터리 전체 크기가 max_bytes 를 넘으면 오래 쓰지 않은 파일부터 삭제
+    """
+
+    def __init__(self, directory, engine, max_bytes=200 * 1024 * 1024, max_concurrency=2, urgent_concurrency=2):
+        self.directory = directory
+        self.engine = engine
+        self.max_bytes = max_bytes
+        self.max_concurrency = max_concurrency
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._urgent_slots = asyncio.Semaphore(urgent_concurrency)
+        self._inflight = {}
+        self._background = set()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.total_bytes = sum(entry.stat().st_size for entry in self._entries())
+        self.hits = 0
+        self.synthesized = 0
+        self.evictions = 0
+        self.errors = 0
+
+    def _entries(self):
+        return [entry for entry in os.scandir(self.directory) if entry.name.endswith(".mp3")]
+
+    def file_name(self, text, lang, voice):
+        return f"{audio_key(text, lang, voice, self.engine.name)}.mp3"
+
+    def path_for(self, text, lang, voice):
+        return os.path.join(self.directory, self.file_name(text, lang, voice))
+
+    def cached_path(self, file_name):
+        """캐시 파일 이름(<sha256>.mp3) 이 맞고 파일이 있으면 경로, 아니면 None"""
+        if not AUDIO_FILE_NAME.fullmatch(file_name):
+            return None
+        path = os.path.join(self.directory, file_name)
+        return path if os.path.exists(path) else None
+
+    def _synthesize(self, text, lang, voice, path, on_chunk=None):
+        # 임시 파일에 쓴 뒤 이름을 바꿔서, 읽는 쪽이 쓰다 만 파일을 보지 않도록
+        fd, tmp_path = tempfile.mkstemp(suffix=".part", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in self.engine.stream(text, lang, voice):
+                    f.write(chunk)
+                    if on_chunk is not None:
+                        on_chunk(chunk)
+            size = os.path.getsize(tmp_path)
+            with self._lock:
+                replaced = os.path.getsize(path) if os.path.exists(path) else 0
+                os.replace(tmp_path, path)
+                self.total_bytes += size - replaced
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._evict(keep=path)
+
+    def _evict(self, keep=None):
+        with self._lock:
+            if self.total_bytes <= self.max_bytes:
+                return
+            entries = sorted(self._entries(), key=lambda entry: entry.stat().st_mtime)
+            for entry in entries:
+                if self.total_bytes <= self.max_bytes:
+                    break
+                if entry.path == keep:
+                    continue
+                size = entry.stat().st_size
+                try:
+                    os.remove(entry.path)
+                except FileNotFoundError:
+                    continue
+                self.total_bytes -= size
+                self.evictions += 1
+
+    async def ensure(self, text, lang=TTS_LANG, voice=TTS_VOICE):
+        """음성 파일 경로 (캐시에 없으면 합성)"""
+        path = self.path_for(text, lang, voice)
+        if os.path.exists(path):
+            try:
+                os.utime(path)
+                self.hits += 1
+                return path
+            except FileNotFoundError:  # 그 사이 삭제됨
+                pass
+
+        return await asyncio.shield(self._start(text, lang, voice, path).future)
+
+    async def _acquire_slot(self, synthesis):
+        """
+        합성 슬롯을 잡고 그 세마포어를 반환
+        일반 슬롯을 기다리는 동안 급한(스트리밍 대기) 합성이 되면 급한 슬롯도 함께 기다려서 먼저 나는 쪽을 씀
+        """
+        acquiring = {asyncio.ensure_future(self._slots.acquire()): self._slots}
+        urgent = asyncio.ensure_future(synthesis.urgent.wait())
+        try:
+            await asyncio.wait({*acquiring, urgent}, return_when=asyncio.FIRST_COMPLETED)
+            if not any(task.done() for task in acquiring):
+                acquiring[asyncio.ensure_future(self._urgent_slots.acquire())] = self._urgent_slots
+                await asyncio.wait(acquiring, return_when=asyncio.FIRST_COMPLETED)
+        except BaseException:
+            # 기다리다 취소됨 -> 이미 잡은 슬롯은 돌려줌
+            for task, slots in acquiring.items():
+                if task.done() and not task.cancelled():
+                    slots.release()
+            raise
+        finally:
+            urgent.cancel()
+            for task in acquiring:
+                if not task.done():
+                    task.cancel()
+        held = [slots for task, slots in acquiring.items() if task.done() and not task.cancelled()]
+        for slots in held[1:]:  # 둘 다 잡혔으면 일반 슬롯만 씀
+            slots.release()
+        return held[0]
+
+    def _start(self, text, lang, voice, path):
+        """진행 중인 합성 (없으면 백그라운드에서 시작). 등록은 바로 하므로 뒤따르는 요청은 항상 여기에 붙음"""
+        synthesis = self._inflight.get(path)
+        if synthesis is None:
+            synthesis = Synthesis(asyncio.get_running_loop())
+            self._inflight[path] = synthesis
+            task = asyncio.create_task(self._run(synthesis, text, lang, voice, path))
+            self._background.add(task)
+            task.add_done_callback(self._background_done)
+        return synthesis
+
+    async def _run(self, synthesis, text, lang, voice, path):
+        try:
+            slots = await self._acquire_slot(synthesis)
+            try:
+                await asyncio.to_thread(self._synthesize, text, lang, voice, path, synthesis.publish)
+            finally:
+                slots.release()
+            self.synthesized += 1
+            synthesis.finish(path)
+        except BaseException as e:
+            self.errors += 1
+            synthesis.finish(error=e)
+            raise
+        finally:
+            del self._inflight[path]
+
+    async def stream(self, text, lang=TTS_LANG, voice=TTS_VOICE, chunk_size=64 * 1024):
+        """
+        음성 바이트를 비동기로 내보냄
+        캐시에 없으면 합성되는 조각을 바로 전달하면서 캐시 파일도 함께 기록
+        이미 합성 중(미리 합성 등)이면 그 합성에 붙어서 지금까지 나온 조각부터 받음
+        (클라이언트가 중간에 끊어도 합성은 끝까지 진행해서 캐시에 남김)
+        """
+        path = self.path_for(text, lang, voice)
+        synthesis = self._inflight.get(path)
+        if synthesis is None and not os.path.exists(path):
+            synthesis = self._start(text, lang, voice, path)
+        if synthesis is not None:
+            async for chunk in synthesis.subscribe():
+                yield chunk
+            return
+
+        path = await self.ensure(text, lang, voice)
+        with open(path, "rb") as f:
+            while chunk := await asyncio.to_thread(f.read, chunk_size):
+                yield chunk
+
+    def pregenerate(self, texts, lang=TTS_LANG, voice=TTS_VOICE):
+        """질문 생성 직후 음성을 백그라운드에서 미리 합성 (동시 실행 수는 max_concurrency 로 제한)"""
+        for text in texts:
+            path = self.path_for(text, lang, voice)
+            if not os.path.exists(path):
+                self._start(text, lang, voice, path)
+
+    def _background_done(self, task):
+        self._background.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            print(f"[tts] 합성 실패: {task.exception()}")
+
+    def stats(self):
+        return {
+            "engine": self.engine.name,
+            "files": len(self._entries()),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "synthesized": self.synthesized,
+            "evictions": self.evictions,
+            "errors": self.errors,
+            "pending": len(self._background),
+        }
+
+
+audio_cache = AudioCache(
+    TTS_CACHE_DIR,
+    ENGINES[TTS_ENGINE](),
+    max_bytes=int(TTS_CACHE_MAX_MB * 1024 * 1024),
+    max_concurrency=TTS_MAX_CONCURRENCY,
+    urgent_concurrency=TTS_URGENT_CONCURRENCY,
+)
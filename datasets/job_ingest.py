@@ -0,0 +1,276 @@
+"""
+노인일자리 구인정보(SenuriService getJobList) 수집 → SQLite
+
+job_API.py 를 대체하는 증분 수집 명령:
+- 첫 페이지의 totalCount 로 전체 페이지 수를 구하고 나머지 페이지는 동시에 요청
+- requests.Session 하나로 연결 재사용, 실패 시 지수 backoff 재시도
+- 응답 XML 은 스트리밍으로 파싱 (<item> 단위로 처리 후 버림)
+- jobId 별 내용 해시로 변경 여부를 판단해서 바뀐 공고만 기록
+- 실행마다 ingest_runs 에 상태 기록 (중간에 실패하면 status='failed' + error, finished_at 은 성공한 실행만)
+
+사용법:
+    SENURI_API_KEY=... python datasets/job_ingest.py --db datasets/job_postings.sqlite3
+    python datasets/job_ingest.py --base-url http://127.0.0.1:8080/getJobList --api-key test
+
+--base-url 로 로컬 스텁 서버(고정 XML 페이지 응답)를 지정해서 테스트할 수 있다.
+"""
+import argparse
+import hashlib
+import math
+import os
+import sqlite3
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = "http://apis.data.go.kr/B552474/SenuriService/getJobList"  # End Point
+
+# API 필드 -> 컬럼 (job_API.py 의 엑셀 컬럼과 같은 항목)
+FIELDS = [
+    "jobId",        # 채용공고ID
+    "recrtTitle",   # 채용공고 제목
+    "oranNm",       # 기업명
+    "workPlcNm",    # 근무지명
+    "emplymShpNm",  # 고용형태
+    "acptMthd",     # 접수방법
+    "frDd",         # 접수 시작일
+    "toDd",         # 접수 종료일
+    "jobclsNm",     # 직종명
+    "deadline",     # 마감여부
+]
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS job_postings (
+    {", ".join(f"{field} TEXT" + (" PRIMARY KEY" if field == "jobId" else "") for field in FIELDS)},
+    content_hash TEXT NOT NULL,
+    first_run INTEGER NOT NULL,
+    updated_run INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_postings_updated_run ON job_postings (updated_run);
+CREATE INDEX IF NOT EXISTS idx_job_postings_toDd ON job_postings (toDd);
+CREATE TABLE IF NOT EXISTS ingest_runs (
+    run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    finished_at REAL,
+    status TEXT NOT NULL DEFAULT 'running',
+    error TEXT,
+    pages INTEGER DEFAULT 0,
+    fetched INTEGER DEFAULT 0,
+    inserted INTEGER DEFAULT 0,
+    updated INTEGER DEFAULT 0,
+    unchanged INTEGER DEFAULT 0
+);
+"""
+
+
+class ApiError(Exception):
+    pass
+
+
+def make_session(pool_size=8, retries=3, backoff=0.5):
+    """연결을 재사용하는 세션 (5xx / 연결 오류는 지수 backoff 로 재시도)"""
+    session = requests.Session()
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def parse_page(chunks):
+    """
+    응답 바이트 조각을 스트리밍 파싱
+    반환: (totalCount 또는 None, item dict 목록)
+    """
+    parser = ET.XMLPullParser(events=("end",))
+    items = []
+    total = None
+    result_code = None
+    result_msg = None
+    for chunk in chunks:
+        parser.feed(chunk)
+        for _, elem in parser.read_events():
+            if elem.tag == "item":
+                items.append({field: (elem.findtext(field) or "").strip() for field in FIELDS})
+                elem.clear()
+            elif elem.tag == "resultCode":
+                result_code = (elem.text or "").strip()
+            elif elem.tag == "resultMsg":
+                result_msg = (elem.text or "").strip()
+            elif elem.tag == "totalCount":
+                total = int(elem.text or 0)
+    parser.close()
+    if result_code not in (None, "00"):
+        raise ApiError(f"API 오류: {result_code} {result_msg}")
+    return total, items
+
+
+def fetch_page(session, base_url, api_key, page_no, num_rows, timeout=30):
+    params = {"serviceKey": api_key, "pageNo": page_no, "numOfRows": num_rows}
+    with session.get(base_url, params=params, timeout=timeout, stream=True) as response:
+        response.raise_for_status()
+        return parse_page(response.iter_content(chunk_size=64 * 1024))
+
+
+def content_hash(item):
+    return hashlib.sha1("\x1f".join(item[field] for field in FIELDS).encode("utf-8")).hexdigest()
+
+
+# 예전 스키마 DB 에 추가하는 컬럼 (기존에 끝난 실행은 성공으로 간주)
+RUN_COLUMNS = {
+    "status": "ALTER TABLE ingest_runs ADD COLUMN status TEXT NOT NULL DEFAULT 'running'",
+    "error": "ALTER TABLE ingest_runs ADD COLUMN error TEXT",
+}
+
+
+def open_db(path):
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(ingest_runs)")}
+    missing = [name for name in RUN_COLUMNS if name not in columns]
+    for name in missing:
+        conn.execute(RUN_COLUMNS[name])
+    if "status" in missing:
+        conn.execute("UPDATE ingest_runs SET status='finished' WHERE finished_at IS NOT NULL")
+    conn.commit()
+    return conn
+
+
+class DeltaWriter:
+    """jobId 별 해시를 메모리에 들고 있다가 새 공고는 INSERT, 바뀐 공고만 UPDATE"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.hashes = dict(conn.execute("SELECT jobId, content_hash FROM job_postings"))
+        self.run_id = conn.execute(
+            "INSERT INTO ingest_runs (started_at) VALUES (?)", (time.time(),)
+        ).lastrowid
+        conn.commit()
+        self.counts = {"pages": 0, "fetched": 0, "inserted": 0, "updated": 0, "unchanged": 0}
+
+    def write(self, items):
+        self.counts["pages"] += 1
+        rows = []
+        for item in items:
+            if not item["jobId"]:
+                continue
+            self.counts["fetched"] += 1
+            digest = content_hash(item)
+            previous = self.hashes.get(item["jobId"])
+            if previous == digest:
+                self.counts["unchanged"] += 1
+                continue
+            self.counts["inserted" if previous is None else "updated"] += 1
+            self.hashes[item["jobId"]] = digest
+            rows.append([item[field] for field in FIELDS] + [digest, self.run_id, self.run_id])
+        if rows:
+            columns = ", ".join(FIELDS)
+            placeholders = ", ".join("?" * (len(FIELDS) + 3))
+            updates = ", ".join(f"{field}=excluded.{field}" for field in FIELDS[1:])
+            self.conn.executemany(
+                f"INSERT INTO job_postings ({columns}, content_hash, first_run, updated_run) "
+                f"VALUES ({placeholders}) "
+                f"ON CONFLICT(jobId) DO UPDATE SET {updates}, "
+                f"content_hash=excluded.content_hash, updated_run=excluded.updated_run",
+                rows,
+            )
+        self.conn.commit()
+
+    def finish(self):
+        """성공한 실행만 finished_at 을 기록 (색인기는 finished_at 이 있는 실행까지만 반영)"""
+        self.conn.execute(
+            "UPDATE ingest_runs SET finished_at=?, status='finished', pages=?, fetched=?, inserted=?, updated=?, "
+            "unchanged=? WHERE run_id=?",
+            (time.time(), *self.counts.values(), self.run_id),
+        )
+        self.conn.commit()
+        return {"run_id": self.run_id, **self.counts}
+
+    def fail(self, error):
+        """중간에 실패한 실행: finished_at 없이 상태와 오류만 기록 (이미 쓴 공고는 다음 성공 실행 때 색인)"""
+        self.conn.rollback()
+        self.conn.execute(
+            "UPDATE ingest_runs SET status='failed', error=?, pages=?, fetched=?, inserted=?, updated=?, unchanged=? "
+            "WHERE run_id=?",
+            (f"{type(error).__name__}: {error}", *self.counts.values(), self.run_id),
+        )
+        self.conn.commit()
+
+
+def ingest(db_path, api_key, base_url=BASE_URL, num_rows=100, max_pages=None, concurrency=4,
+           retries=3, backoff=0.5):
+    session = make_session(pool_size=concurrency, retries=retries, backoff=backoff)
+    conn = open_db(db_path)
+    writer = DeltaWriter(conn)
+    try:
+        total, items = fetch_page(session, base_url, api_key, 1, num_rows)
+        writer.write(items)
+
+        if total is not None:
+            pages = math.ceil(total / num_rows)
+            if max_pages:
+                pages = min(pages, max_pages)
+            # 나머지 페이지는 동시에 요청하고, 도착한 순서대로 DB 에 반영 (DB 쓰기는 이 스레드에서만)
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [
+                    executor.submit(fetch_page, session, base_url, api_key, page_no, num_rows)
+                    for page_no in range(2, pages + 1)
+                ]
+                for future in futures:
+                    writer.write(future.result()[1])
+        else:
+            # totalCount 가 없으면 빈 페이지가 나올 때까지 순서대로
+            page_no = 1
+            while items and (not max_pages or page_no < max_pages):
+                page_no += 1
+                _, items = fetch_page(session, base_url, api_key, page_no, num_rows)
+                writer.write(items)
+    except BaseException as e:
+        writer.fail(e)
+        raise
+    else:
+        return writer.finish()
+    finally:
+        conn.close()
+        session.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.path.join(os.path.dirname(__file__), "job_postings.sqlite3"))
+    parser.add_argument("--api-key", default=os.getenv("SENURI_API_KEY"))
+    parser.add_argument("--base-url", default=BASE_URL)
+    parser.add_argument("--num-rows", type=int, default=100, help="한 페이지 결과 수")
+    parser.add_argument("--max-pages", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--retries", type=int, default=3)
+    parser.add_argument("--backoff", type=float, default=0.5)
+    args = parser.parse_args()
+    if not args.api_key:
+        raise SystemExit("API 키가 필요합니다 (--api-key 또는 SENURI_API_KEY)")
+
+    started = time.perf_counter()
+    summary = ingest(
+        args.db,
+        args.api_key,
+        base_url=args.base_url,
+        num_rows=args.num_rows,
+        max_pages=args.max_pages,
+        concurrency=args.concurrency,
+        retries=args.retries,
+        backoff=args.backoff,
+    )
+    print(f"수집 완료 ({time.perf_counter() - started:.1f}s): {summary}")
+
+
+if __name__ == "__main__":
+    main()
@@ -20,6 +20,8 @@ import axios from "axios";
 const ResultPage = ({ recommendations, summary }) => {
   const [loadingQuestions, setLoadingQuestions] = useState(false); // 면접 질문 생성 로딩 상태
   const [questions, setQuestions] = useState([]);
+  const [sessionId, setSessionId] = useState(null); // 면접 질문 세션 ID
+  const [audioUrls, setAudioUrls] = useState([]); // 질문별 캐시 음성 URL (/tts/audio/<해시>.mp3)
   const [openQuestions, setOpenQuestions] = useState(false);
   const [selectedJob, setSelectedJob] = useState(null);
   const [result, setResult] = useState(null);
@@ -27,6 +29,7 @@ const ResultPage = ({ recommendations, summary }) => {
   const videoRef = useRef(null);
   const wsRef = useRef(null);
   const streamRef = useRef(null);
+  const playedAudioRef = useRef(new Set()); // 끝까지 재생해서 서버에 음성 파일이 있는 캐시 음성 URL
 
   const additionalJobs = [
     { title: "프로젝트 매니저", description: "근무지: 서울 강남구, 연봉: 협의 후 결정" },
@@ -44,6 +47,8 @@ const ResultPage = ({ recommendations, summary }) => {
         { job_description: jobDescription }
       );
       setQuestions(response.data.questions);
+      setSessionId(response.data.session_id);
+      setAudioUrls(response.data.audio_urls || []);
       setSelectedJob(jobDescription);
       setOpenQuestions(true);
     } catch (error) {
@@ -56,9 +61,17 @@ const ResultPage = ({ recommendations, summary }) => {
   // TTS 음성 재생 핸들러
   const handleTTS = async (question, index) => {
     try {
-      const response = await axios.get(`http://localhost:8000/tts/${index}`);
-      const audioUrl = `http://localhost:8000${response.data.audio_file}`;
+      // 처음에는 합성되는 대로 스트리밍 재생, 한 번 끝까지 재생한 뒤에는 캐시 음성 URL 로 재생
+      // (내용 해시 URL 이라 브라우저 캐시에서 재생되어 서버까지 가지 않음)
+      const cachedUrl = audioUrls[index];
+      const played = cachedUrl && playedAudioRef.current.has(cachedUrl);
+      const audioUrl = played
+        ? `http://localhost:8000${cachedUrl}`
+        : `http://localhost:8000/tts/${index}/stream?session_id=${encodeURIComponent(sessionId)}`;
       const audio = new Audio(audioUrl);
+      if (cachedUrl && !played) {
+        audio.addEventListener("ended", () => playedAudioRef.current.add(cachedUrl));
+      }
       audio.play().catch((error) => {
         console.error("Audio play failed:", error);
         alert("오디오 재생에 실패했습니다. 브라우저 설정을 확인해주세요.");
@@ -79,7 +92,8 @@ const ResultPage = ({ recommendations, summary }) => {
         await videoRef.current.play();
       }
 
-      const ws = new WebSocket("ws://localhost:8000/conf/ws/analyze");
+      const ws = new WebSocket("ws://localhost:8000/conf/ws/analyze/v2");
+      ws.binaryType = "arraybuffer";
       wsRef.current = ws;
 
       ws.onopen = () => {
@@ -128,8 +142,12 @@ const ResultPage = ({ recommendations, summary }) => {
         canvas.width = video.videoWidth;
         canvas.height = video.videoHeight;
         context.drawImage(video, 0, 0, canvas.width, canvas.height);
-        const imageData = canvas.toDataURL("image/jpeg").split(",")[1];
-        wsRef.current?.send(imageData);
+        // v2: base64 대신 JPEG 바이너리 그대로 전송
+        canvas.toBlob((blob) => {
+          if (blob && wsRef.current?.readyState === WebSocket.OPEN) {
+            wsRef.current.send(blob);
+          }
+        }, "image/jpeg");
       }
     }, 100);
 